@@ -1,314 +1,7 @@
 #!/usr/bin/env python3
-"""
-增强交易信号系统 - 6大功能
-1. 买入信号 2. 卖出信号 3. 止盈提醒 4. 止损提醒 5. 挂单评估 6. Top5标的推荐
-"""
+"""兼容入口: python3 enhanced_trading_signals.py，实现位于 universal_market_monitor.enhanced_trading_signals"""
+from universal_market_monitor.enhanced_trading_signals import *  # noqa: F401,F403
+from universal_market_monitor.enhanced_trading_signals import main
 
-import os
-import sys
-sys.path.insert(0, '/Users/zhangkuo/.openclaw/workspace/skills/universal-market-monitor')
-
-import pandas as pd
-import numpy as np
-from datetime import datetime
-from monitor import OKXMonitor, CONFIG
-
-class EnhancedTradingSignals(OKXMonitor):
-    def __init__(self):
-        super().__init__()
-        self.min_volume_24h = 10000000  # $10M USD
-        self.all_symbols = []  # 动态获取
-        
-    def get_active_symbols(self):
-        """获取24h交易量>=$10M的活跃合约标的"""
-        print(f"\n📊 获取活跃合约标的 (24h交易量 >= ${self.min_volume_24h/1e6:.0f}M)...")
-        
-        # 批量获取所有ticker（更高效）
-        tickers_data = self._request('GET', '/api/v5/market/tickers?instType=SWAP')
-        if not tickers_data or tickers_data.get('code') != '0':
-            print("❌ 获取行情失败，使用默认列表")
-            return self._get_default_symbols()
-        
-        active_symbols = []
-        tickers = tickers_data.get('data', [])
-        
-        print(f"  共 {len(tickers)} 个合约，筛选中...")
-        
-        for ticker in tickers:
-            symbol = ticker.get('instId', '')
-            # 只选USDT合约
-            if not symbol.endswith('-USDT-SWAP'):
-                continue
-            
-            vol_24h = float(ticker.get('volCcy24h', 0))  # USDT计价成交量
-            
-            if vol_24h >= self.min_volume_24h:
-                active_symbols.append({
-                    'symbol': symbol,
-                    'vol_24h': vol_24h,
-                    'price': float(ticker.get('last', 0))
-                })
-        
-        # 按交易量排序
-        active_symbols.sort(key=lambda x: x['vol_24h'], reverse=True)
-        
-        print(f"  ✅ 筛选出 {len(active_symbols)} 个活跃合约 (24h>${self.min_volume_24h/1e6:.0f}M)")
-        if len(active_symbols) > 0:
-            top5 = active_symbols[:5]
-            print(f"  前5: " + ", ".join([f"{s['symbol'].replace('-USDT-SWAP','')}(${s['vol_24h']/1e6:.0f}M)" for s in top5]))
-        
-        return [s['symbol'] for s in active_symbols]
-    
-    def _get_default_symbols(self):
-        """默认标的列表（备用）"""
-        return [
-            "BTC-USDT-SWAP", "ETH-USDT-SWAP", "SOL-USDT-SWAP",
-            "XRP-USDT-SWAP", "DOGE-USDT-SWAP", "ADA-USDT-SWAP",
-            "AVAX-USDT-SWAP", "LINK-USDT-SWAP", "MATIC-USDT-SWAP",
-            "DOT-USDT-SWAP", "UNI-USDT-SWAP", "ATOM-USDT-SWAP"
-        ]
-    
-    # ============ 功能1&2: 买卖信号 ============
-    def generate_trading_signals(self, symbol):
-        """生成交易信号"""
-        df = self.get_klines(symbol, limit=150)
-        if df is None or len(df) < 50:
-            return None
-        
-        df = self.calculate_signals(df)
-        latest = df.iloc[-1]
-        prev = df.iloc[-2]
-        
-        signals = []
-        
-        # 买入信号: 接近支撑+看涨形态+趋势向上
-        if (prev['dist_to_sup'] < CONFIG['snr_thresh'] and 
-            prev['bullish'] and 
-            prev['close'] > prev['ema']):
-            
-            entry = latest['close']
-            stop_loss = entry * (1 - CONFIG['stop_loss_pct'])
-            take_profit = entry * (1 + CONFIG['take_profit_pct'])
-            
-            signals.append({
-                'type': 'BUY',
-                'symbol': symbol,
-                'entry_price': entry,
-                'stop_loss': stop_loss,
-                'take_profit': take_profit,
-                'confidence': self._calculate_confidence(df, 'long'),
-                'reason': f"价格接近支撑位(${prev['support']:.4f})+看涨形态+EMA上方"
-            })
-        
-        # 卖出信号: 接近阻力+看跌形态+趋势向下
-        elif (prev['dist_to_res'] < CONFIG['snr_thresh'] and 
-              prev['bearish'] and 
-              prev['close'] < prev['ema']):
-            
-            entry = latest['close']
-            stop_loss = entry * (1 + CONFIG['stop_loss_pct'])
-            take_profit = entry * (1 - CONFIG['take_profit_pct'])
-            
-            signals.append({
-                'type': 'SELL',
-                'symbol': symbol,
-                'entry_price': entry,
-                'stop_loss': stop_loss,
-                'take_profit': take_profit,
-                'confidence': self._calculate_confidence(df, 'short'),
-                'reason': f"价格接近阻力位(${prev['resistance']:.4f})+看跌形态+EMA下方"
-            })
-        
-        return signals[0] if signals else None
-    
-    def _calculate_confidence(self, df, direction):
-        """计算信号置信度"""
-        score = 50  # 基础分
-        
-        # 趋势强度
-        latest = df.iloc[-1]
-        if direction == 'long' and latest['close'] > latest['ema']:
-            score += 15
-        elif direction == 'short' and latest['close'] < latest['ema']:
-            score += 15
-        
-        # 成交量确认
-        if latest['volume'] > latest['avg_vol'] * 1.5:
-            score += 10
-        
-        # 波动率适中
-        volatility = df['close'].pct_change().std() * 100
-        if 1 < volatility < 5:
-            score += 10
-        
-        return min(score, 95)
-    
-    # ============ 功能3&4: 止盈止损提醒 ============
-    def check_exit_signals(self, positions):
-        """检查离场信号"""
-        alerts = []
-        
-        for pos in positions.values():
-            if float(pos.get('pos', 0)) == 0:
-                continue
-            
-            symbol = pos['instId']
-            entry = float(pos.get('avgPx', 0))
-            mark = float(pos.get('markPx', 0))
-            side = pos['posSide']
-            pnl_pct = float(pos.get('uplRatio', 0)) * 100
-            
-            # 获取K线判断反转
-            df = self.get_klines(symbol, limit=50)
-            if df is not None and len(df) > 10:
-                latest = df.iloc[-1]
-                
-                # 止盈提醒: 盈利5%+反转信号
-                if pnl_pct >= 5:
-                    reversal = False
-                    if side == 'long' and latest['bearish']:
-                        reversal = True
-                    elif side == 'short' and latest['bullish']:
-                        reversal = True
-                    
-                    if reversal:
-                        alerts.append({
-                            'type': 'TAKE_PROFIT_SUGGEST',
-                            'symbol': symbol,
-                            'side': side,
-                            'pnl_pct': pnl_pct,
-                            'suggestion': '建议减仓50%锁定利润，出现反转信号'
-                        })
-                
-                # 止损提醒: 亏损3%+结构破坏
-                if pnl_pct <= -3:
-                    structure_broken = False
-                    if side == 'long' and mark < latest['support']:
-                        structure_broken = True
-                    elif side == 'short' and mark > latest['resistance']:
-                        structure_broken = True
-                    
-                    if structure_broken:
-                        alerts.append({
-                            'type': 'STOP_LOSS_SUGGEST',
-                            'symbol': symbol,
-                            'side': side,
-                            'pnl_pct': pnl_pct,
-                            'suggestion': '建议止损离场，结构已破坏'
-                        })
-        
-        return alerts
-    
-    # ============ 功能5: 挂单评估 ============
-    def evaluate_pending_orders(self, orders):
-        """评估挂单位置合理性"""
-        evaluations = []
-        
-        for order in orders:
-            symbol = order['instId']
-            order_price = float(order['px'])
-            order_side = order['side']  # buy or sell
-            
-            df = self.get_klines(symbol, limit=100)
-            if df is None:
-                continue
-            
-            df = self.calculate_signals(df)
-            latest = df.iloc[-1]
-            current = latest['close']
-            support = latest['support']
-            resistance = latest['resistance']
-            
-            evaluation = {
-                'symbol': symbol,
-                'order_price': order_price,
-                'current_price': current,
-                'side': order_side
-            }
-            
-            # 评估逻辑
-            if order_side == 'buy':
-                if abs(order_price - support) / support < 0.01:
-                    evaluation['rating'] = '✅ 优秀'
-                    evaluation['comment'] = f'挂单位置接近支撑位(${support:.4f})，合理'
-                elif order_price > current * 1.02:
-                    evaluation['rating'] = '⚠️ 偏高'
-                    evaluation['comment'] = f'挂单高于现价2%以上，可能无法成交'
-                elif order_price < support * 0.98:
-                    evaluation['rating'] = '❌ 过低'
-                    evaluation['comment'] = f'挂单远低于支撑位，需等待深跌'
-                else:
-                    evaluation['rating'] = '➖ 一般'
-                    evaluation['comment'] = '位置中性，可接受'
-            else:  # sell
-                if abs(order_price - resistance) / resistance < 0.01:
-                    evaluation['rating'] = '✅ 优秀'
-                    evaluation['comment'] = f'挂单位置接近阻力位(${resistance:.4f})，合理'
-                elif order_price < current * 0.98:
-                    evaluation['rating'] = '⚠️ 偏低'
-                    evaluation['comment'] = f'挂单低于现价2%以上，可能无法成交'
-                else:
-                    evaluation['rating'] = '➖ 一般'
-                    evaluation['comment'] = '位置中性，可接受'
-            
-            evaluations.append(evaluation)
-        
-        return evaluations
-    
-    # ============ 功能6: Top5标的推荐 ============
-    def scan_top5_opportunities(self):
-        """扫描全市场，推荐Top5交易标的（基于24h交易量筛选）"""
-        # 动态获取活跃标的
-        self.all_symbols = self.get_active_symbols()
-        
-        if not self.all_symbols:
-            print("⚠️ 未获取到活跃标的，使用默认列表")
-            self.all_symbols = self._get_default_symbols()
-        
-        print(f"\n🔍 扫描 {len(self.all_symbols)} 个高流动性标的 (24h交易量>=${self.min_volume_24h/1e6:.0f}M)...")
-        
-        opportunities = []
-        
-        for symbol in self.all_symbols[:30]:  # 最多扫描前30个
-            try:
-                signal = self.generate_trading_signals(symbol)
-                if signal and signal['confidence'] >= 60:
-                    opportunities.append(signal)
-            except Exception as e:
-                continue
-        
-        # 按置信度排序
-        opportunities.sort(key=lambda x: x['confidence'], reverse=True)
-        top5 = opportunities[:5]
-        
-        return top5
-    
-    def format_top5_report(self, top5):
-        """格式化Top5报告"""
-        report = []
-        report.append("\n" + "="*80)
-        report.append("🏆 TOP 5 交易机会推荐")
-        report.append("="*80)
-        
-        for i, opp in enumerate(top5, 1):
-            stars = "⭐" * (opp['confidence'] // 20)
-            report.append(f"\n{i}. 【{opp['type']}】{opp['symbol']}")
-            report.append(f"   推荐指数: {opp['confidence']}/100 {stars}")
-            report.append(f"   建议挂单: ${opp['entry_price']:.4f}")
-            report.append(f"   止损价格: ${opp['stop_loss']:.4f}")
-            report.append(f"   止盈价格: ${opp['take_profit']:.4f}")
-            report.append(f"   推荐原因: {opp['reason']}")
-        
-        report.append("\n" + "="*80)
-        return "\n".join(report)
-
-# 测试运行
 if __name__ == '__main__':
-    signals = EnhancedTradingSignals()
-    
-    # 测试Top5扫描
-    top5 = signals.scan_top5_opportunities()
-    if top5:
-        print(signals.format_top5_report(top5))
-    else:
-        print("暂无高置信度交易机会")
+    main()
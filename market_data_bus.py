@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+"""兼容入口: python3 market_data_bus.py，实现位于 universal_market_monitor.market_data_bus"""
+from universal_market_monitor.market_data_bus import *  # noqa: F401,F403
+from universal_market_monitor.market_data_bus import main
+
+if __name__ == '__main__':
+    main()
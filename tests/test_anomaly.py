@@ -0,0 +1,35 @@
+from universal_market_monitor.anomaly import AnomalyDetector
+
+
+def feed(detector, prices):
+    alerts = []
+    for price in prices:
+        alerts.extend(detector.update({'X': price}))
+    return alerts
+
+
+def test_warm_up_uses_fixed_threshold():
+    detector = AnomalyDetector(min_samples=5, fallback_pct=0.02)
+    assert feed(detector, [100, 101]) == []  # 1% < 2%
+    alerts = feed(detector, [104])
+    assert [a.type for a in alerts] == ['volatility']
+    assert alerts[0].zscore is None  # 预热期没有z-score
+    assert detector.stats('X')['n'] == 2
+
+
+def test_after_warm_up_threshold_adapts_to_volatility():
+    calm = AnomalyDetector(min_samples=5, z_threshold=4.0, min_move_pct=0.005)
+    feed(calm, [100, 100.1] * 5)
+    alerts = feed(calm, [101.5])  # 约1.4%，远超平静期波动，但低于固定2%
+    assert len(alerts) == 1 and alerts[0].zscore > 4
+
+    noisy = AnomalyDetector(min_samples=5, z_threshold=4.0)
+    feed(noisy, [100, 103] * 5)
+    assert feed(noisy, [106.5]) == []  # 约3.4%，高于固定2%，但在该标的的正常波动内
+
+
+def test_min_move_suppresses_tiny_moves_on_flat_series():
+    detector = AnomalyDetector(min_samples=5, min_move_pct=0.005)
+    feed(detector, [100.0] * 10)
+    assert feed(detector, [100.2]) == []  # z很大，但只有0.2%
+    assert len(feed(detector, [101.0])) == 1
@@ -0,0 +1,84 @@
+import pytest
+
+from universal_market_monitor.history import HistoryDownloader, HistoryStore, BAR_MS
+
+STEP = BAR_MS['1H']
+START = 1_700_000_000_000 - 1_700_000_000_000 % STEP
+N_BARS = 250  # 3 页
+
+
+def candle(ts):
+    return [str(ts), '100', '101', '99', '100', '10', '1000', '1000', '1']
+
+
+class FakeExchange:
+    """按 history-candles 的翻页语义(新→旧，after/before 为开区间)返回K线"""
+
+    def __init__(self, n=N_BARS, fail_after=None):
+        self.series = [START + i * STEP for i in range(n)]
+        self.calls = []
+        self.fail_after = fail_after
+
+    def fetch_page(self, symbol, after=None, before=None):
+        self.calls.append((after, before))
+        if self.fail_after is not None and len(self.calls) > self.fail_after:
+            return None
+        rows = [ts for ts in reversed(self.series)
+                if (after is None or ts < after) and (before is None or ts > before)]
+        return [candle(ts) for ts in rows[:100]]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite'))
+    yield store
+    store.close()
+
+
+def downloader(store, exchange):
+    loader = HistoryDownloader(store, bar='1H')
+    loader.fetch_page = exchange.fetch_page
+    return loader
+
+
+def stored_ts(store):
+    return [row[0] for row in store.rows('X', '1H')]
+
+
+def test_backfill_resumes_from_checkpoint(store):
+    exchange = FakeExchange(fail_after=1)
+    downloader(store, exchange).backfill_symbol('X', START)
+    assert len(stored_ts(store)) == 100
+    oldest, complete = store.checkpoint('X', '1H')
+    assert oldest == exchange.series[-100] and not complete
+
+    exchange.fail_after = None
+    exchange.calls.clear()
+    downloader(store, exchange).backfill_symbol('X', START)
+    assert stored_ts(store) == exchange.series
+    # 第二次从检查点继续，而不是从最新一页重新翻
+    assert (oldest, None) in exchange.calls
+    assert exchange.calls.count((None, None)) == 1  # 只有“补最新”那一页
+
+
+def test_backfill_marks_listing_reached(store):
+    exchange = FakeExchange()
+    downloader(store, exchange).backfill_symbol('X', START - 10 * STEP)
+    assert store.checkpoint('X', '1H') == (START, True)
+    exchange.calls.clear()
+    downloader(store, exchange).backfill_symbol('X', START - 10 * STEP)
+    assert exchange.calls == [(None, None)]
+
+
+def test_gaps_are_detected_and_refilled(store):
+    exchange = FakeExchange()
+    missing = set(exchange.series[120:135]) | {exchange.series[200]}
+    store.write_page('X', '1H', [candle(ts) for ts in reversed(exchange.series) if ts not in missing],
+                     oldest_ts=START, complete=True)
+    assert store.find_gaps('X', '1H') == [(exchange.series[119], exchange.series[135]),
+                                          (exchange.series[199], exchange.series[201])]
+
+    written = downloader(store, exchange).backfill_symbol('X', START)
+    assert store.find_gaps('X', '1H') == []
+    assert stored_ts(store) == exchange.series
+    assert written >= len(missing)
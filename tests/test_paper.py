@@ -0,0 +1,103 @@
+import pytest
+
+from universal_market_monitor.paper import PaperExchange, TAKER_FEE
+
+FLAT = [(i * 3_600_000, 100.0, 100.0, 100.0, 100.0, 1.0) for i in range(3)]
+CANDLES = {'X': FLAT + [(3 * 3_600_000, 100.0, 111.0, 100.0, 110.0, 1.0),
+                        (4 * 3_600_000, 90.0, 95.0, 89.0, 92.0, 1.0)]}
+
+
+def exchange(balance=1000, warmup=3, leverage=10):
+    return PaperExchange(CANDLES, balance=balance, leverage=leverage, warmup=warmup, bar='1H')
+
+
+def test_long_round_trip_pnl_and_fees():
+    ex = exchange()
+    assert ex.place_order('X', 'buy', 2)[1] == '0'
+    assert ex.cash == pytest.approx(1000 - 2 * 100 * TAKER_FEE)
+    ex.advance()
+    view = ex._position_views()[0]
+    assert view['upl'] == pytest.approx(20)
+    assert view['uplRatio'] == pytest.approx(20 / 20)
+    ex.place_order('X', 'sell', 2)
+    assert ex.cash == pytest.approx(1000 + 20 - 2 * 100 * TAKER_FEE - 2 * 110 * TAKER_FEE)
+    assert not ex._position_views()
+
+
+def test_short_position_profits_when_price_falls():
+    ex = exchange(warmup=4)
+    ex.place_order('X', 'sell', 1, pos_side='short')
+    ex.advance()
+    assert ex._position_views()[0]['upl'] == pytest.approx(110 - 92)
+
+
+def test_net_mode_reversal_uses_reversal_price():
+    ex = exchange()
+    ex.place_order('X', 'buy', 1)
+    ex.advance()
+    ex.place_order('X', 'sell', 3)
+    position = ex.positions[('X', 'net')]
+    assert position['pos'] == -2 and position['avgPx'] == 110
+    assert ex.cash == pytest.approx(1000 + 10 - 100 * TAKER_FEE - 3 * 110 * TAKER_FEE)
+
+
+def test_marketable_limit_fills_at_last_price():
+    ex = exchange()
+    ord_id, code, _ = ex.place_order('X', 'buy', 1, 'limit', px=105)
+    assert code == '0' and ex.orders[ord_id]['fillPx'] == 100
+
+
+def test_resting_order_freezes_margin_until_cancelled():
+    ex = exchange(balance=100)
+    ord_id, code, _ = ex.place_order('X', 'buy', 8, 'limit', px=95)
+    assert code == '0'
+    assert ex.frozen == pytest.approx(8 * 95 / 10 + 8 * 95 * TAKER_FEE)
+    assert ex.place_order('X', 'buy', 8, 'limit', px=95)[1] == '51008'
+    ex.cancel_order(ord_id)
+    assert ex.frozen == 0
+    assert ex._avail_balance() == pytest.approx(100)
+
+
+def test_gap_through_limit_fills_at_open_and_releases_margin():
+    ex = exchange(warmup=4)
+    ord_id, _, _ = ex.place_order('X', 'buy', 1, 'limit', px=95)
+    assert ex.advance() == 1
+    assert ex.orders[ord_id]['fillPx'] == 90 and ex.frozen == 0
+
+
+def test_ioc_and_fok_cancel_when_not_immediately_fillable():
+    ex = exchange()
+    for ord_type in ('ioc', 'fok'):
+        ord_id, code, _ = ex.place_order('X', 'buy', 1, ord_type, px=99)
+        assert code == '0' and ex.orders[ord_id]['state'] == 'canceled'
+    assert not ex.bids.get('X') and ex.frozen == 0
+    ord_id, code, _ = ex.place_order('X', 'buy', 1, 'ioc', px=101)
+    assert code == '0' and ex.orders[ord_id]['state'] == 'filled'
+
+
+def test_post_only_rejected_when_marketable():
+    ex = exchange()
+    assert ex.place_order('X', 'buy', 1, 'post_only', px=101)[1] == '51000'
+    ord_id, code, _ = ex.place_order('X', 'buy', 1, 'post_only', px=99)
+    assert code == '0' and ex.orders[ord_id]['state'] == 'live'
+
+
+def test_unknown_order_type_rejected():
+    assert exchange().place_order('X', 'buy', 1, 'trigger', px=99)[1] == '51000'
+
+
+def test_close_without_position_rejected():
+    ex = exchange()
+    assert ex.place_order('X', 'sell', 1, pos_side='long')[1] == '51169'
+    assert ex.place_order('X', 'buy', 1, pos_side='short')[1] == '51169'
+    response = ex.request('POST', '/api/v5/trade/order',
+                          {'instId': 'X', 'side': 'sell', 'posSide': 'long', 'ordType': 'market', 'sz': '1'})
+    assert response['code'] != '0' and response['data'][0]['sCode'] == '51169'
+
+
+def test_candles_aggregate_by_bar():
+    ex = exchange(warmup=5)
+    rows = ex._candle_rows('X', 10, bar='2H')
+    assert [r[0] for r in rows] == [str(4 * 3_600_000), str(2 * 3_600_000), '0']
+    assert rows[1][1:5] == ['100', '111', '100', '110'] and rows[1][8] == '1'
+    assert ex.request('GET', '/api/v5/market/candles?instId=X&bar=30m')['code'] != '0'
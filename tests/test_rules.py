@@ -0,0 +1,60 @@
+from universal_market_monitor.rules import (
+    Rule, RuleEngine, EVENT_TICK, EVENT_BAR, EVENT_POSITION, EVENT_BALANCE,
+)
+
+
+class CountingRule(Rule):
+    events = (EVENT_TICK,)
+
+    def evaluate(self, event, state):
+        state['seen'] = state.get('seen', 0) + 1
+        self.calls = getattr(self, 'calls', 0) + 1
+        return None
+
+
+def test_events_only_reach_matching_symbol_and_type():
+    btc = CountingRule('btc', symbols=['BTC'])
+    any_symbol = CountingRule('any')
+    bar_only = CountingRule('bar', events=[EVENT_BAR])
+    engine = RuleEngine([btc, any_symbol, bar_only])
+
+    engine.dispatch({'type': EVENT_TICK, 'symbol': 'ETH', 'price': 1.0})
+    assert getattr(btc, 'calls', 0) == 0 and any_symbol.calls == 1
+    engine.dispatch({'type': EVENT_TICK, 'symbol': 'BTC', 'price': 1.0})
+    assert btc.calls == 1 and any_symbol.calls == 2
+    assert getattr(bar_only, 'calls', 0) == 0
+
+    assert engine.subscribers(EVENT_TICK, 'BTC') == [btc, any_symbol]
+    assert engine.subscribers(EVENT_TICK, 'ETH') == [any_symbol]
+    assert engine.subscribers(EVENT_BAR, 'ETH') == [bar_only]
+    assert not engine.has_subscribers(EVENT_BALANCE)
+
+
+def test_state_is_kept_per_rule_and_symbol():
+    engine = RuleEngine.from_config([{'name': 'cross', 'type': 'price_cross', 'above': 100}])
+    assert engine.dispatch({'type': EVENT_TICK, 'symbol': 'A', 'price': 99}) == []
+    # B 的首个价格不会借用 A 的上次价格
+    assert engine.dispatch({'type': EVENT_TICK, 'symbol': 'B', 'price': 101}) == []
+    alerts = engine.dispatch({'type': EVENT_TICK, 'symbol': 'A', 'price': 101})
+    assert [(a.type, a.symbol, a.rule) for a in alerts] == [('price_cross', 'A', 'cross')]
+
+
+def test_from_config_fills_defaults_from_global_config():
+    config = {'price_alert_threshold': 0.1, 'stop_loss_pct': 0.05, 'take_profit_pct': 0.2}
+    engine = RuleEngine.from_config([
+        {'type': 'price_change'},
+        {'type': 'price_change', 'name': 'tight', 'symbols': ['A'], 'threshold': 0.01},
+        {'type': 'position_pnl'},
+    ], config)
+    loose, tight, pnl = engine.rules
+    assert loose.name == 'price_change_0' and loose.params == {'threshold': 0.1}
+    assert tight.params == {'threshold': 0.01}
+    assert pnl.params == {'stop_loss_pct': 0.05, 'take_profit_pct': 0.2}
+
+    engine.dispatch({'type': EVENT_TICK, 'symbol': 'A', 'price': 100})
+    fired = engine.dispatch({'type': EVENT_TICK, 'symbol': 'A', 'price': 103})
+    assert [a.rule for a in fired] == ['tight']
+
+    event = {'type': EVENT_POSITION, 'symbol': 'A', 'side': 'net', 'pos': -1,
+             'entry_price': 100, 'mark_price': 106}
+    assert [a.type for a in engine.dispatch(event)] == ['stop_loss']
@@ -0,0 +1,27 @@
+"""
+Universal Market Monitor - 通用市场监控系统
+子模块与重依赖(pandas/numpy/requests)均按需加载
+"""
+
+__version__ = "2.0.0"
+
+_LAZY = {
+    'CONFIG': 'monitor',
+    'OKXMonitor': 'monitor',
+    'EnhancedTradingSignals': 'enhanced_trading_signals',
+    'FeishuNotifier': 'feishu_notifier',
+    'MarketDataPublisher': 'market_data_bus',
+    'MarketDataReader': 'market_data_bus',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        module = importlib.import_module(f".{_LAZY[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
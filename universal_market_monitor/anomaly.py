@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+流式异常检测 - 按标的维护在线统计量，自适应阈值替代固定百分比
+
+每个标的在连续数组中占一行，所有标的一次向量化更新 (O(1)/标的):
+  - 对数收益率: Welford 均值/方差 + EWMA 波动率 (RiskMetrics, λ=0.94)
+  - 成交量: log(1+vol) 的指数加权均值/方差，得到 z-score
+预热期(样本数 < min_samples)内退回固定阈值，行为与旧版一致。
+预热后还要求涨跌幅超过 min_move_pct，避免长期不变的序列(如空闲账户余额)波动率趋零后微小变动被放大成警报。
+"""
+
+import os
+import numpy as np
+
+from .records import Alert
+
+# (字段, 初始值, dtype)
+_ARRAYS = (
+    ('n', 0, np.int64),
+    ('mean', 0.0, float),
+    ('m2', 0.0, float),
+    ('ewm_var', 0.0, float),
+    ('last_price', np.nan, float),
+    ('vol_n', 0, np.int64),
+    ('vol_mean', 0.0, float),
+    ('vol_var', 0.0, float),
+    ('last_bar_ts', np.nan, float),
+)
+_STATE_FIELDS = tuple(field for field, _, _ in _ARRAYS)
+
+
+class AnomalyDetector:
+    """多标的在线统计与自适应警报"""
+
+    def __init__(self, symbols=(), z_threshold=4.0, volume_z_threshold=3.0,
+                 ewma_lambda=0.94, volume_alpha=0.05, min_samples=20, fallback_pct=0.02,
+                 min_move_pct=0.005):
+        self.z_threshold = z_threshold
+        self.volume_z_threshold = volume_z_threshold
+        self.ewma_lambda = ewma_lambda
+        self.volume_alpha = volume_alpha
+        self.min_samples = min_samples
+        self.fallback_pct = fallback_pct
+        self.min_move_pct = min_move_pct
+        self.symbols = []
+        self.index = {}
+        self._alloc(max(len(symbols), 8))
+        for symbol in symbols:
+            self.add_symbol(symbol)
+
+    def _alloc(self, capacity):
+        """按容量分配(或扩容)状态数组，保留已有标的的数据"""
+        size = len(self.symbols)
+        for field, fill, dtype in _ARRAYS:
+            grown = np.full(capacity, fill, dtype=dtype)
+            old = getattr(self, field, None)
+            if old is not None:
+                grown[:size] = old[:size]
+            setattr(self, field, grown)
+
+    def add_symbol(self, symbol):
+        if symbol in self.index:
+            return self.index[symbol]
+        if len(self.symbols) == len(self.n):
+            self._alloc(len(self.n) * 2)
+        self.index[symbol] = len(self.symbols)
+        self.symbols.append(symbol)
+        return self.index[symbol]
+
+    # ============ 向量化更新 ============
+    def update_arrays(self, prices, volumes=None, bar_ts=None):
+        """
+        prices/volumes/bar_ts 与 self.symbols 对齐，缺失值填 NaN
+        成交量只在 bar_ts 比上次新时计入（同一根K线多次轮询不重复统计）
+        返回 (price_z, return_pct, volume_z, price_alert_mask, volume_alert_mask)
+        """
+        size = len(self.symbols)
+        prices = np.asarray(prices, dtype=float)
+        last = self.last_price[:size]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ret = np.log(prices / last)
+        valid = np.isfinite(ret)
+
+        # 先用更新前的波动率打分，避免冲击被自身吸收
+        n = self.n[:size].copy()
+        sigma = np.sqrt(np.maximum(self.ewm_var[:size], 1e-12))
+        price_z = np.where(valid, ret / sigma, 0.0)
+        return_pct = np.where(valid, np.expm1(ret), 0.0)
+        warm = n >= self.min_samples
+        price_alert = valid & np.where(
+            warm, (np.abs(price_z) > self.z_threshold) & (np.abs(return_pct) > self.min_move_pct),
+            np.abs(return_pct) > self.fallback_pct)
+
+        # Welford
+        n_new = n + valid
+        delta = np.where(valid, ret - self.mean[:size], 0.0)
+        self.mean[:size] += np.where(valid, delta / np.maximum(n_new, 1), 0.0)
+        self.m2[:size] += np.where(valid, delta * (ret - self.mean[:size]), 0.0)
+        self.n[:size] = n_new
+
+        # EWMA 方差，首个样本直接初始化
+        r2 = np.where(valid, ret * ret, 0.0)
+        lam = self.ewma_lambda
+        self.ewm_var[:size] = np.where(
+            valid, np.where(n == 0, r2, lam * self.ewm_var[:size] + (1 - lam) * r2), self.ewm_var[:size])
+        self.last_price[:size] = np.where(np.isfinite(prices) & (prices > 0), prices, last)
+
+        volume_z = np.zeros(size)
+        volume_alert = np.zeros(size, dtype=bool)
+        if volumes is not None:
+            volumes = np.asarray(volumes, dtype=float)
+            if bar_ts is None:
+                fresh = np.isfinite(volumes)
+            else:
+                bar_ts = np.asarray(bar_ts, dtype=float)
+                last_ts = self.last_bar_ts[:size]
+                fresh = np.isfinite(volumes) & (np.isnan(last_ts) | (bar_ts > last_ts))
+                self.last_bar_ts[:size] = np.where(fresh, bar_ts, last_ts)
+            lv = np.log1p(np.where(fresh, np.maximum(volumes, 0), 0.0))
+            vn = self.vol_n[:size].copy()
+            vmean = self.vol_mean[:size]
+            vvar = self.vol_var[:size]
+            volume_z = np.where(fresh & (vvar > 0), (lv - vmean) / np.sqrt(np.maximum(vvar, 1e-12)), 0.0)
+            volume_alert = fresh & (vn >= self.min_samples) & (volume_z > self.volume_z_threshold)
+
+            diff = lv - vmean
+            incr = self.volume_alpha * diff
+            self.vol_mean[:size] = np.where(fresh, np.where(vn == 0, lv, vmean + incr), vmean)
+            self.vol_var[:size] = np.where(
+                fresh & (vn > 0), (1 - self.volume_alpha) * (vvar + diff * incr), vvar)
+            self.vol_n[:size] = vn + fresh
+
+        return price_z, return_pct, volume_z, price_alert, volume_alert
+
+    def update(self, quotes, kind='price'):
+        """
+        quotes: {symbol: (price, volume, bar_ts)}，volume/bar_ts 可省略
+        返回 Alert 列表
+        """
+        for symbol in quotes:
+            self.add_symbol(symbol)
+        size = len(self.symbols)
+        prices = np.full(size, np.nan)
+        volumes = np.full(size, np.nan)
+        bar_ts = np.full(size, np.nan)
+        for symbol, quote in quotes.items():
+            if not isinstance(quote, (tuple, list)):
+                quote = (quote,)
+            i = self.index[symbol]
+            prices[i] = quote[0]
+            if len(quote) > 1 and quote[1] is not None:
+                volumes[i] = quote[1]
+            if len(quote) > 2 and quote[2] is not None:
+                bar_ts[i] = quote[2]
+
+        price_z, return_pct, volume_z, price_alert, volume_alert = \
+            self.update_arrays(prices, volumes, bar_ts)
+
+        alerts = []
+        for i in np.flatnonzero(price_alert):
+            symbol = self.symbols[i]
+            price = float(prices[i])
+            change = float(return_pct[i]) * 100
+            # 预热期内按固定阈值触发，z-score 尚无意义
+            zscore = float(price_z[i]) if self.n[i] > self.min_samples else None
+            if kind == 'balance':
+                direction = '增加' if change > 0 else '减少'
+                alerts.append(Alert(
+                    type='balance_anomaly',
+                    balance=price,
+                    change_pct=abs(change),
+                    zscore=zscore,
+                    message=f'🔔 账户余额异常{direction} {abs(change):.2f}%，当前: ${price:.2f}'
+                ))
+            else:
+                direction = '上涨' if change > 0 else '下跌'
+                sigma = f' ({zscore:+.1f}σ)' if zscore is not None else ''
+                alerts.append(Alert(
+                    type='volatility',
+                    symbol=symbol,
+                    price=price,
+                    change_pct=abs(change),
+                    zscore=zscore,
+                    message=f'⚠️ {symbol} 大幅{direction} {abs(change):.2f}%{sigma}'
+                ))
+        for i in np.flatnonzero(volume_alert):
+            symbol = self.symbols[i]
+            alerts.append(Alert(
+                type='volume_spike',
+                symbol=symbol,
+                volume=float(volumes[i]),
+                zscore=float(volume_z[i]),
+                message=f'📈 {symbol} 成交量异常放大 ({volume_z[i]:+.1f}σ)'
+            ))
+        return alerts
+
+    def stats(self, symbol):
+        """单个标的的当前统计量"""
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+        n = int(self.n[i])
+        return {
+            'n': n,
+            'mean': float(self.mean[i]),
+            'var': float(self.m2[i] / (n - 1)) if n > 1 else 0.0,
+            'ewma_vol': float(np.sqrt(self.ewm_var[i])),
+            'volume_mean': float(self.vol_mean[i]),
+            'volume_std': float(np.sqrt(self.vol_var[i])),
+        }
+
+    # ============ 状态持久化 ============
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        size = len(self.symbols)
+        tmp = path + '.tmp.npz'
+        np.savez(tmp, symbols=np.array(self.symbols, dtype=str),
+                 **{field: getattr(self, field)[:size] for field in _STATE_FIELDS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """从文件恢复，文件不存在或损坏时返回空检测器"""
+        detector = cls(**kwargs)
+        if not os.path.exists(path):
+            return detector
+        try:
+            with np.load(path) as data:
+                symbols = [str(s) for s in data['symbols']]
+                for symbol in symbols:
+                    detector.add_symbol(symbol)
+                size = len(symbols)
+                for field in _STATE_FIELDS:
+                    getattr(detector, field)[:size] = data[field]
+        except (OSError, KeyError, ValueError):
+            return cls(**kwargs)
+        return detector
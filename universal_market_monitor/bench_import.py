@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+入口启动耗时基准
+每个入口在全新解释器中导入，记录导入耗时、进程总耗时以及是否加载了重依赖
+"""
+
+import sys
+import time
+import subprocess
+
+ENTRY_MODULES = [
+    'universal_market_monitor.price_alert',
+    'universal_market_monitor.monitor',
+    'universal_market_monitor.enhanced_trading_signals',
+    'universal_market_monitor.market_data_bus',
+]
+HEAVY_MODULES = ('pandas', 'numpy', 'requests')
+PRICE_ALERT_BUDGET_MS = 100
+
+PROBE = """
+import sys, time
+t = time.perf_counter()
+import {module}
+ms = (time.perf_counter() - t) * 1000
+print(ms, ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def measure(module, repeat=5):
+    """返回 (最快导入耗时ms, 最快进程耗时ms, 已加载的重依赖)"""
+    best_import, best_total, heavy = None, None, ''
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                             capture_output=True, text=True)
+        total = (time.perf_counter() - started) * 1000
+        if out.returncode != 0:
+            return None, None, out.stderr.strip().splitlines()[-1]
+        import_ms, _, heavy = out.stdout.strip().partition(' ')
+        best_import = min(best_import or float('inf'), float(import_ms))
+        best_total = min(best_total or float('inf'), total)
+    return best_import, best_total, heavy
+
+
+def main():
+    print(f"{'入口模块':<52}{'导入ms':>10}{'进程ms':>10}  重依赖")
+    ok = True
+    for module in ENTRY_MODULES:
+        import_ms, total_ms, heavy = measure(module)
+        if import_ms is None:
+            print(f"{module:<52}{'-':>10}{'-':>10}  ❌ {heavy}")
+            if module.endswith('price_alert'):
+                ok = False
+            continue
+        print(f"{module:<52}{import_ms:>10.1f}{total_ms:>10.1f}  {heavy or '-'}")
+        if module.endswith('price_alert') and (heavy or total_ms > PRICE_ALERT_BUDGET_MS):
+            ok = False
+    if not ok:
+        print(f"\n❌ 轻量价格警报入口导入失败、超出 {PRICE_ALERT_BUDGET_MS}ms 或加载了重依赖")
+        return 1
+    print(f"\n✅ 轻量价格警报入口满足 {PRICE_ALERT_BUDGET_MS}ms 启动预算")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
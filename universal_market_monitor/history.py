@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+历史K线批量下载 - /api/v5/market/history-candles
+多标的并发翻页 + 全局限速，进度写入SQLite检查点，中断后从断点继续，并自动检测/回补缺口
+
+每一页K线与检查点在同一个事务中提交，进程随时被杀掉都不会丢进度。
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from .monitor import CONFIG, WORKSPACE, BASE_URL
+
+HISTORY_DB = os.path.join(WORKSPACE, "history.sqlite")
+PAGE_LIMIT = 100  # history-candles 单页上限
+RATE_LIMIT = 20  # OKX history-candles 限制: 20次/2s
+RATE_WINDOW = 2.0
+DEFAULT_RATE = 9  # 请求/秒
+MAX_RETRIES = 5
+
+BAR_MS = {
+    '1m': 60_000, '3m': 180_000, '5m': 300_000, '15m': 900_000, '30m': 1_800_000,
+    '1H': 3_600_000, '2H': 7_200_000, '4H': 14_400_000, '6H': 21_600_000,
+    '12H': 43_200_000, '1D': 86_400_000, '1W': 604_800_000,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    inst_id TEXT NOT NULL,
+    bar TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL, high REAL, low REAL, close REAL,
+    vol REAL, vol_ccy REAL, vol_ccy_quote REAL,
+    confirm INTEGER,
+    PRIMARY KEY (inst_id, bar, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS checkpoints (
+    inst_id TEXT NOT NULL,
+    bar TEXT NOT NULL,
+    oldest_ts INTEGER,
+    complete INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (inst_id, bar)
+);
+"""
+
+
+class RateLimiter:
+    """线程安全的令牌桶，任意 T 秒内最多放行 burst + rate·T 次"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def okx_rate_limiter(rate):
+    """保证任意 RATE_WINDOW 窗口内不超过 RATE_LIMIT 次: burst + rate·window <= limit"""
+    max_rate = (RATE_LIMIT - 1) / RATE_WINDOW
+    if rate > max_rate:
+        print(f"⚠️ 限速 {rate}/s 超过OKX限制，降为 {max_rate}/s")
+        rate = max_rate
+    return RateLimiter(rate, burst=max(1, int(RATE_LIMIT - rate * RATE_WINDOW)))
+
+
+class HistoryStore:
+    """本地K线库 (SQLite)，所有写入串行化到一个连接"""
+
+    def __init__(self, path=HISTORY_DB):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+
+    def write_page(self, symbol, bar, rows, oldest_ts=None, complete=None):
+        """写入一页K线并推进检查点（同一事务），complete 表示已回溯到上市时间"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO candles VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                [(symbol, bar, int(r[0]), float(r[1]), float(r[2]), float(r[3]), float(r[4]),
+                  float(r[5]), float(r[6]), float(r[7]), int(r[8])) for r in rows])
+            if oldest_ts is not None or complete is not None:
+                self.conn.execute(
+                    "INSERT INTO checkpoints (inst_id, bar, oldest_ts, complete) VALUES (?,?,?,?) "
+                    "ON CONFLICT(inst_id, bar) DO UPDATE SET "
+                    "oldest_ts = COALESCE(excluded.oldest_ts, oldest_ts), complete = MAX(complete, excluded.complete)",
+                    (symbol, bar, oldest_ts, int(bool(complete))))
+
+    def checkpoint(self, symbol, bar):
+        """返回 (oldest_ts, complete)，无记录时为 (None, False)"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT oldest_ts, complete FROM checkpoints WHERE inst_id=? AND bar=?",
+                (symbol, bar)).fetchone()
+        return (row[0], bool(row[1])) if row else (None, False)
+
+    def newest_ts(self, symbol, bar):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT MAX(ts) FROM candles WHERE inst_id=? AND bar=? AND confirm=1",
+                (symbol, bar)).fetchone()
+        return row[0]
+
+    def find_gaps(self, symbol, bar, since=None):
+        """返回缺口列表 [(缺口前一根ts, 缺口后一根ts), ...]"""
+        step = BAR_MS[bar]
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT prev_ts, ts FROM ("
+                "  SELECT ts, LAG(ts) OVER (ORDER BY ts) AS prev_ts FROM candles"
+                "  WHERE inst_id=? AND bar=? AND ts>=?"
+                ") WHERE ts - prev_ts > ?",
+                (symbol, bar, since or 0, step)).fetchall()
+        return rows
+
+    def rows(self, symbol, bar=None, start=None, end=None):
+        """按时间升序返回 (ts, open, high, low, close, vol) 元组"""
+        bar = bar or CONFIG['timeframe']
+        with self.lock:
+            return self.conn.execute(
+                "SELECT ts, open, high, low, close, vol FROM candles "
+                "WHERE inst_id=? AND bar=? AND ts>=? AND ts<=? ORDER BY ts",
+                (symbol, bar, start or 0, end or 2**62)).fetchall()
+
+    def load_df(self, symbol, bar=None, start=None, end=None):
+        """读取为与 OKXMonitor.get_klines 相同格式的DataFrame"""
+        import pandas as pd
+        bar = bar or CONFIG['timeframe']
+        with self.lock:
+            df = pd.read_sql_query(
+                "SELECT ts AS timestamp, open, high, low, close, vol FROM candles "
+                "WHERE inst_id=? AND bar=? AND ts>=? AND ts<=? ORDER BY ts",
+                self.conn, params=(symbol, bar, start or 0, end or 2**62))
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    def close(self):
+        self.conn.close()
+
+
+class HistoryDownloader:
+    """并发翻页下载器"""
+
+    def __init__(self, store, bar=None, rate=DEFAULT_RATE, workers=8):
+        import requests
+
+        self.store = store
+        self.bar = bar or CONFIG['timeframe']
+        if self.bar not in BAR_MS:
+            raise ValueError(f"不支持的K线周期: {self.bar}")
+        self.limiter = okx_rate_limiter(rate)
+        self.workers = workers
+        self.local = threading.local()
+        self._session_factory = requests.Session
+
+    def _session(self):
+        if not hasattr(self.local, 'session'):
+            self.local.session = self._session_factory()
+        return self.local.session
+
+    def fetch_page(self, symbol, after=None, before=None):
+        """拉取一页（新→旧），限速与429重试在这里处理"""
+        params = {'instId': symbol, 'bar': self.bar, 'limit': PAGE_LIMIT}
+        if after is not None:
+            params['after'] = after
+        if before is not None:
+            params['before'] = before
+        for attempt in range(MAX_RETRIES):
+            self.limiter.acquire()
+            try:
+                response = self._session().get(BASE_URL + '/api/v5/market/history-candles',
+                                               params=params, timeout=10)
+                data = response.json()
+            except Exception as e:
+                print(f"❌ {symbol} Request error: {e}")
+                time.sleep(2 ** attempt)
+                continue
+            if data.get('code') == '0':
+                return data['data']
+            if response.status_code == 429 or data.get('code') == '50011':
+                time.sleep(2 ** attempt)
+                continue
+            print(f"❌ {symbol} API error: {data.get('code')} {data.get('msg')}")
+            return None
+        return None
+
+    def backfill_symbol(self, symbol, start_ts):
+        """单个标的: 补最新 → 向前回填到start_ts → 回补缺口，返回写入条数"""
+        written = 0
+
+        # 1. 补齐上次运行之后的新K线
+        newest = self.store.newest_ts(symbol, self.bar)
+        if newest is not None:
+            cursor = None
+            while True:
+                rows = self.fetch_page(symbol, after=cursor)
+                if not rows:
+                    break
+                self.store.write_page(symbol, self.bar, rows)
+                written += len(rows)
+                cursor = int(rows[-1][0])
+                if cursor <= newest:
+                    break
+
+        # 2. 从检查点继续向前翻页
+        oldest, complete = self.store.checkpoint(symbol, self.bar)
+        if not complete and (oldest is None or oldest > start_ts):
+            cursor = oldest
+            while True:
+                rows = self.fetch_page(symbol, after=cursor)
+                if rows is None:
+                    break  # 出错，保留检查点下次继续
+                if not rows:
+                    self.store.write_page(symbol, self.bar, [], oldest_ts=cursor, complete=True)
+                    break  # 已到上市时间
+                cursor = int(rows[-1][0])
+                self.store.write_page(symbol, self.bar, rows, oldest_ts=cursor)
+                written += len(rows)
+                if cursor <= start_ts:
+                    break
+
+        # 3. 检测并回补缺口
+        for gap_start, gap_end in self.store.find_gaps(symbol, self.bar, since=start_ts):
+            cursor = gap_end
+            while cursor > gap_start:
+                rows = self.fetch_page(symbol, after=cursor, before=gap_start)
+                if not rows:
+                    break  # 交易所本身缺数据(停机/维护)
+                self.store.write_page(symbol, self.bar, rows)
+                written += len(rows)
+                cursor = int(rows[-1][0])
+
+        return written
+
+    def run(self, symbols, days):
+        """并发回填多个标的"""
+        start_ts = int((time.time() - days * 86400) * 1000)
+        started = time.time()
+        total = 0
+        print(f"📥 回填 {len(symbols)} 个标的 {self.bar} K线，{days} 天，{self.workers} 线程")
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.backfill_symbol, s, start_ts): s for s in symbols}
+            for i, future in enumerate(as_completed(futures), 1):
+                symbol = futures[future]
+                try:
+                    written = future.result()
+                except Exception as e:
+                    print(f"  ❌ {symbol}: {e}")
+                    continue
+                total += written
+                print(f"  [{i}/{len(symbols)}] {symbol}: {written} 根")
+        print(f"✅ 完成，共写入 {total} 根K线，耗时 {time.time() - started:.0f}s")
+        return total
+
+
+def top_swap_symbols(limit):
+    """按24h成交额取前N个USDT永续合约（公共接口）"""
+    import requests
+
+    data = requests.get(BASE_URL + '/api/v5/market/tickers',
+                        params={'instType': 'SWAP'}, timeout=10).json()
+    tickers = [t for t in data.get('data', []) if t['instId'].endswith('-USDT-SWAP')]
+    tickers.sort(key=lambda t: float(t.get('volCcy24h') or 0), reverse=True)
+    return [t['instId'] for t in tickers[:limit]]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="OKX历史K线批量下载（可断点续传）")
+    parser.add_argument('--symbols', nargs='*', default=CONFIG['symbols'])
+    parser.add_argument('--top', type=int, help="改为下载24h成交额前N的USDT永续")
+    parser.add_argument('--bar', default=CONFIG['timeframe'])
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--db', default=HISTORY_DB)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help=f"每秒请求数上限(<= {(RATE_LIMIT - 1) / RATE_WINDOW})")
+    args = parser.parse_args()
+
+    symbols = top_swap_symbols(args.top) if args.top else args.symbols
+    print(f"[{datetime.now()}] 🗄  本地库: {args.db}")
+    store = HistoryStore(args.db)
+    try:
+        HistoryDownloader(store, bar=args.bar, rate=args.rate, workers=args.workers).run(symbols, args.days)
+    except KeyboardInterrupt:
+        print("\n⏸  已中断，进度已保存，重新运行即可继续")
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+共享内存行情总线
+一个发布进程从OKX拉取K线/行情/指标写入共享内存，多个监控进程零网络读取
+
+内存布局:
+  [总线头 64B][ticker表][槽位0][槽位1]...
+  ticker表 = 表头(seq/数量/更新时间) + max_tickers 条全市场ticker，一次请求整表写入
+  每个槽位 = 槽位头(seq/标的/ticker/指标/更新时间) + max_bars 根K线 (ts, open, high, low, close, vol)
+ticker表与每个槽位各自使用顺序锁(seqlock)：写入前seq置为奇数，写完置为偶数；
+读者前后两次seq一致且为偶数时数据才是完整的，否则让出CPU后重读。
+读者按总线头中的发布间隔判断数据是否过期，过期时调用方回退到直连API。
+"""
+
+import os
+import sys
+import time
+import struct
+from datetime import datetime
+from multiprocessing import shared_memory
+
+DEFAULT_BUS_NAME = "umm_market_bus"
+DEFAULT_MAX_BARS = 300
+DEFAULT_MAX_SYMBOLS = 256
+DEFAULT_MAX_TICKERS = 1024
+ACTIVE_MIN_VOLUME = 10_000_000  # 动态标的: 24h成交额(USDT) >= $10M
+
+BUS_MAGIC = b"UMMBUS01"
+BUS_VERSION = 3
+
+# 总线头: magic, version, max_symbols, max_bars, n_symbols, 全局seq, 发布间隔(秒), max_tickers, 心跳(ms)
+HEADER_FMT = "<8sIIIIQdId"
+HEADER_SIZE = 64
+HEARTBEAT_OFFSET = 44
+
+# ticker表头: seq, 数量, 保留, 更新时间(ms)；每条: 标的 + ticker
+TICKER_TABLE_FMT = "<QIId"
+TICKER_TABLE_HEADER_SIZE = 32
+TICKER_ENTRY_FMT = "<32s6d"
+TICKER_ENTRY_SIZE = struct.calcsize(TICKER_ENTRY_FMT)
+
+# 槽位头: seq, 标的, K线数量, 保留, ticker(ts,last,bid,ask,vol24h,volCcy24h), 指标(support,resistance,ts), 更新时间(ms)
+SLOT_SEQ_FMT = "<Q"
+SLOT_META_FMT = "<32sII"
+SLOT_META_OFFSET = 8
+TICKER_FMT = "<6d"
+TICKER_OFFSET = 48
+INDICATOR_FMT = "<3d"
+INDICATOR_OFFSET = 96
+SLOT_UPDATED_OFFSET = 120
+SLOT_HEADER_SIZE = 128
+
+CANDLE_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'vol')
+CANDLE_FMT = "<6d"
+CANDLE_SIZE = struct.calcsize(CANDLE_FMT)
+TICKER_FIELDS = ('ts', 'last', 'bidPx', 'askPx', 'vol24h', 'volCcy24h')
+INDICATOR_FIELDS = ('support', 'resistance', 'ts')
+
+# 读者重试时长: 远大于发布一个标的(300根K线约0.3ms)的写入耗时
+READ_TIMEOUT = 0.05
+# 超过 发布间隔 × STALE_INTERVALS 未更新视为过期(发布者停滞)
+STALE_INTERVALS = 1.5
+# 未声明发布间隔的总线，心跳超过该秒数才允许新发布者接管
+TAKEOVER_AGE = 60
+# 读者发现数据过期时按名字重新挂载的最小间隔(秒)
+REATTACH_INTERVAL = 5.0
+
+
+def _ticker_table_size(max_tickers):
+    return TICKER_TABLE_HEADER_SIZE + max_tickers * TICKER_ENTRY_SIZE
+
+
+def _slot_size(max_bars):
+    return SLOT_HEADER_SIZE + max_bars * CANDLE_SIZE
+
+
+def _slots_offset(max_tickers):
+    return HEADER_SIZE + _ticker_table_size(max_tickers)
+
+
+def _bus_size(max_symbols, max_bars, max_tickers):
+    return _slots_offset(max_tickers) + max_symbols * _slot_size(max_bars)
+
+
+def _open_segment(name):
+    """挂载已存在的段；不拥有该段，避免进程退出时被resource_tracker误删"""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:
+        pass
+    return shm
+
+
+def _publisher_age(buf):
+    """发布者心跳距今秒数；不是本版本的总线时返回None"""
+    magic, version = struct.unpack_from("<8sI", buf, 0)
+    if magic != BUS_MAGIC or version != BUS_VERSION:
+        return None
+    return time.time() - struct.unpack_from("<d", buf, HEARTBEAT_OFFSET)[0] / 1000
+
+
+def active_symbols(tickers, min_volume=ACTIVE_MIN_VOLUME, limit=None):
+    """24h成交额 >= min_volume 的USDT永续，按成交额降序"""
+    active = [t for t in tickers
+              if t.get('instId', '').endswith('-USDT-SWAP') and float(t.get('volCcy24h') or 0) >= min_volume]
+    active.sort(key=lambda t: float(t.get('volCcy24h') or 0), reverse=True)
+    return [t['instId'] for t in active[:limit]]
+
+
+class MarketDataPublisher:
+    """行情发布者：唯一写入方，负责创建共享内存段"""
+
+    def __init__(self, symbols, name=DEFAULT_BUS_NAME, max_bars=DEFAULT_MAX_BARS,
+                 max_symbols=DEFAULT_MAX_SYMBOLS, max_tickers=DEFAULT_MAX_TICKERS, interval=0):
+        if len(symbols) > max_symbols:
+            raise ValueError(f"标的数量 {len(symbols)} 超过总线容量 {max_symbols}")
+        self.name = name
+        self.max_bars = max_bars
+        self.max_symbols = max_symbols
+        self.max_tickers = max_tickers
+        self.slot_size = _slot_size(max_bars)
+        self.slots_offset = _slots_offset(max_tickers)
+        size = _bus_size(max_symbols, max_bars, max_tickers)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            existing = _open_segment(name)
+            age = _publisher_age(existing.buf)
+            if age is not None:
+                interval = struct.unpack_from("<d", existing.buf, 32)[0]
+                max_age = interval * STALE_INTERVALS if interval > 0 else TAKEOVER_AGE
+                if age <= max_age:
+                    existing.close()
+                    raise RuntimeError(f"行情总线 {name} 已有发布进程在运行 (心跳 {age:.0f}s 前)")
+            # 上一个发布者异常退出后残留的段，接管；已挂载的读者发现过期后会重新挂载
+            existing.close()
+            existing.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.buf = self.shm.buf
+        self.slots = {}
+        self._global_seq = 0
+        # interval=0 表示不做过期判断
+        struct.pack_into(HEADER_FMT, self.buf, 0, BUS_MAGIC, BUS_VERSION,
+                         max_symbols, max_bars, 0, 0, float(interval), max_tickers, time.time() * 1000)
+        for symbol in symbols:
+            self.add_symbol(symbol)
+
+    def add_symbol(self, symbol):
+        """注册标的并分配槽位"""
+        if symbol in self.slots:
+            return self.slots[symbol]
+        index = len(self.slots)
+        if index >= self.max_symbols:
+            raise ValueError(f"总线槽位已满 ({self.max_symbols})")
+        offset = self.slots_offset + index * self.slot_size
+        struct.pack_into(SLOT_SEQ_FMT, self.buf, offset, 0)
+        struct.pack_into(SLOT_META_FMT, self.buf, offset + SLOT_META_OFFSET,
+                         symbol.encode('utf-8'), 0, 0)
+        self.slots[symbol] = offset
+        self._write_header()
+        return offset
+
+    def _write_header(self):
+        self._global_seq += 1
+        struct.pack_into("<IQ", self.buf, 20, len(self.slots), self._global_seq)
+        struct.pack_into("<d", self.buf, HEARTBEAT_OFFSET, time.time() * 1000)
+
+    def _begin(self, offset):
+        seq = struct.unpack_from(SLOT_SEQ_FMT, self.buf, offset)[0] + 1
+        struct.pack_into(SLOT_SEQ_FMT, self.buf, offset, seq)  # 奇数: 写入中
+        return seq
+
+    def _commit(self, offset, seq):
+        struct.pack_into(SLOT_SEQ_FMT, self.buf, offset, seq + 1)  # 偶数: 可读
+        self._write_header()
+
+    def publish(self, symbol, candles=None, ticker=None, indicators=None):
+        """
+        原子地更新一个标的
+        candles: [(ts_ms, open, high, low, close, vol), ...] 按时间升序
+        ticker: {'ts','last','bidPx','askPx','vol24h','volCcy24h'}
+        indicators: {'support','resistance'}
+        """
+        offset = self.add_symbol(symbol)
+        if candles is not None:
+            # 写入前打包好，缩短seq为奇数的窗口
+            candles = candles[-self.max_bars:]
+            packed = struct.pack(f"<{len(candles) * 6}d", *[v for row in candles for v in row])
+        seq = self._begin(offset)
+        try:
+            if candles is not None:
+                base = offset + SLOT_HEADER_SIZE
+                self.buf[base:base + len(packed)] = packed
+                struct.pack_into("<I", self.buf, offset + SLOT_META_OFFSET + 32, len(candles))
+            if ticker is not None:
+                struct.pack_into(TICKER_FMT, self.buf, offset + TICKER_OFFSET,
+                                 *[float(ticker.get(f) or 0) for f in TICKER_FIELDS])
+            if indicators is not None:
+                struct.pack_into(INDICATOR_FMT, self.buf, offset + INDICATOR_OFFSET,
+                                 float(indicators.get('support') or 0),
+                                 float(indicators.get('resistance') or 0),
+                                 time.time() * 1000)
+            struct.pack_into("<d", self.buf, offset + SLOT_UPDATED_OFFSET, time.time() * 1000)
+        finally:
+            self._commit(offset, seq)
+
+    def publish_tickers(self, tickers):
+        """整表写入全市场ticker (OKX /market/tickers 的 data 列表)"""
+        tickers = tickers[:self.max_tickers]
+        packed = b''.join(
+            struct.pack(TICKER_ENTRY_FMT, t['instId'].encode('utf-8'),
+                        *[float(t.get(f) or 0) for f in TICKER_FIELDS])
+            for t in tickers)
+        offset = HEADER_SIZE
+        seq = self._begin(offset)
+        try:
+            base = offset + TICKER_TABLE_HEADER_SIZE
+            self.buf[base:base + len(packed)] = packed
+            struct.pack_into(TICKER_TABLE_FMT, self.buf, offset, seq, len(tickers), 0, time.time() * 1000)
+        finally:
+            self._commit(offset, seq)
+
+    def close(self, unlink=True):
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class MarketDataReader:
+    """行情读取者：只读挂载共享内存段，不产生任何网络请求"""
+
+    def __init__(self, name=DEFAULT_BUS_NAME):
+        self.name = name
+        self._last_reattach = 0.0
+        self._attach(_open_segment(name))
+
+    def _attach(self, shm):
+        magic, version = struct.unpack_from("<8sI", shm.buf, 0)
+        if magic != BUS_MAGIC or version != BUS_VERSION:
+            shm.close()
+            raise ValueError(f"共享内存 {self.name} 不是有效的行情总线")
+        self.shm = shm
+        self.buf = shm.buf
+        _, _, self.max_symbols, self.max_bars, _, _, self.interval, self.max_tickers, _ = \
+            struct.unpack_from(HEADER_FMT, self.buf, 0)
+        self.slot_size = _slot_size(self.max_bars)
+        self.slots_offset = _slots_offset(self.max_tickers)
+        self.slots = {}
+        self._indexed = 0
+
+    def heartbeat(self):
+        """发布者最近一次写入的时间(ms)"""
+        return struct.unpack_from("<d", self.buf, HEARTBEAT_OFFSET)[0]
+
+    def reattach(self):
+        """
+        发布进程重启会换一个同名的新段，旧段不再更新。
+        按名字重新挂载(最多每 REATTACH_INTERVAL 秒一次)，换到了更新的段时返回True
+        """
+        now = time.monotonic()
+        if now - self._last_reattach < REATTACH_INTERVAL:
+            return False
+        self._last_reattach = now
+        try:
+            shm = _open_segment(self.name)
+        except FileNotFoundError:
+            return False
+        age = _publisher_age(shm.buf)
+        if age is None or struct.unpack_from("<d", shm.buf, HEARTBEAT_OFFSET)[0] <= self.heartbeat():
+            shm.close()  # 仍是同一个段(或无效段)
+            return False
+        old = self.shm
+        self._attach(shm)
+        try:
+            old.close()
+        except BufferError:
+            pass  # 调用方还持有 candles_view 返回的旧视图
+        return True
+
+    def _refresh_index(self):
+        n_symbols = struct.unpack_from("<I", self.buf, 20)[0]
+        for index in range(self._indexed, n_symbols):
+            offset = self.slots_offset + index * self.slot_size
+            raw = struct.unpack_from("<32s", self.buf, offset + SLOT_META_OFFSET)[0]
+            self.slots[raw.rstrip(b'\x00').decode('utf-8')] = offset
+        self._indexed = n_symbols
+
+    def _slot(self, symbol):
+        if symbol not in self.slots:
+            self._refresh_index()
+        return self.slots.get(symbol)
+
+    def _read_consistent(self, offset, read):
+        """seqlock读: 写入中或读到一半被改写时让出CPU重读，超过READ_TIMEOUT返回None"""
+        deadline = None
+        while True:
+            seq = struct.unpack_from(SLOT_SEQ_FMT, self.buf, offset)[0]
+            if seq % 2 == 0:
+                value = read()
+                if struct.unpack_from(SLOT_SEQ_FMT, self.buf, offset)[0] == seq:
+                    return seq, value
+            now = time.monotonic()
+            if deadline is None:
+                deadline = now + READ_TIMEOUT
+            elif now > deadline:
+                return None, None
+            time.sleep(0)
+
+    def global_seq(self):
+        """总线全局序号，任何标的更新都会递增"""
+        return struct.unpack_from("<Q", self.buf, 24)[0]
+
+    def max_age(self):
+        """数据最大允许年龄(秒)，发布者未声明间隔时为None(不判断过期)"""
+        return self.interval * STALE_INTERVALS if self.interval > 0 else None
+
+    def is_fresh(self, updated_ms):
+        max_age = self.max_age()
+        return max_age is None or time.time() - updated_ms / 1000 <= max_age
+
+    def symbols(self):
+        self._refresh_index()
+        return list(self.slots)
+
+    def seq(self, symbol):
+        offset = self._slot(symbol)
+        if offset is None:
+            return None
+        return struct.unpack_from(SLOT_SEQ_FMT, self.buf, offset)[0]
+
+    def candles_view(self, symbol):
+        """
+        零拷贝K线视图 (memoryview，按 CANDLE_FMT 排列)
+        返回 (seq, view)；使用完毕后用 is_consistent(symbol, seq) 校验期间没有被改写
+        """
+        offset = self._slot(symbol)
+        if offset is None:
+            return None, None
+        seq = struct.unpack_from(SLOT_SEQ_FMT, self.buf, offset)[0]
+        n = struct.unpack_from("<I", self.buf, offset + SLOT_META_OFFSET + 32)[0]
+        base = offset + SLOT_HEADER_SIZE
+        return seq, self.buf[base:base + n * CANDLE_SIZE]
+
+    def is_consistent(self, symbol, seq):
+        return seq is not None and seq % 2 == 0 and self.seq(symbol) == seq
+
+    def read(self, symbol, fresh_only=False):
+        """
+        读取一致的快照: {'seq','updated','candles','ticker','indicators'}
+        fresh_only=True 时数据过期返回None；过期时先尝试重新挂载(发布者可能已重启)
+        """
+        offset = self._slot(symbol)
+        if offset is None:
+            return None
+
+        def read():
+            n = struct.unpack_from("<I", self.buf, offset + SLOT_META_OFFSET + 32)[0]
+            base = offset + SLOT_HEADER_SIZE
+            return (bytes(self.buf[base:base + n * CANDLE_SIZE]),
+                    struct.unpack_from(TICKER_FMT, self.buf, offset + TICKER_OFFSET),
+                    struct.unpack_from(INDICATOR_FMT, self.buf, offset + INDICATOR_OFFSET),
+                    struct.unpack_from("<d", self.buf, offset + SLOT_UPDATED_OFFSET)[0])
+
+        seq, value = self._read_consistent(offset, read)
+        if value is None:
+            return None
+        raw, ticker, indicators, updated = value
+        if not self.is_fresh(updated) and self.reattach():
+            return self.read(symbol, fresh_only)
+        if fresh_only and not self.is_fresh(updated):
+            return None
+        return {
+            'seq': seq,
+            'updated': updated,
+            'candles': list(struct.iter_unpack(CANDLE_FMT, raw)),
+            'ticker': dict(zip(TICKER_FIELDS, ticker)),
+            'indicators': dict(zip(INDICATOR_FIELDS, indicators)),
+        }
+
+    def tickers(self, fresh_only=True):
+        """全市场ticker，格式同 /market/tickers 的 data (数值为float)；无数据或过期时返回None"""
+        def read():
+            _, count, _, updated = struct.unpack_from(TICKER_TABLE_FMT, self.buf, HEADER_SIZE)
+            base = HEADER_SIZE + TICKER_TABLE_HEADER_SIZE
+            return bytes(self.buf[base:base + count * TICKER_ENTRY_SIZE]), updated
+
+        _, value = self._read_consistent(HEADER_SIZE, read)
+        if value is None or not value[1]:
+            return None
+        raw, updated = value
+        if not self.is_fresh(updated) and self.reattach():
+            return self.tickers(fresh_only)
+        if fresh_only and not self.is_fresh(updated):
+            return None
+        return [{'instId': inst.rstrip(b'\x00').decode('utf-8'), **dict(zip(TICKER_FIELDS, fields))}
+                for inst, *fields in struct.iter_unpack(TICKER_ENTRY_FMT, raw)]
+
+    def get_ticker(self, symbol):
+        snapshot = self.read(symbol, fresh_only=True)
+        return snapshot['ticker'] if snapshot else None
+
+    def get_indicators(self, symbol):
+        snapshot = self.read(symbol, fresh_only=True)
+        return snapshot['indicators'] if snapshot else None
+
+    def get_klines_df(self, symbol, limit=100):
+        """与 OKXMonitor.get_klines 相同格式的DataFrame；无数据或已过期时返回None"""
+        snapshot = self.read(symbol)
+        if not snapshot or not snapshot['candles']:
+            return None
+        if not self.is_fresh(snapshot['updated']):
+            age = time.time() - snapshot['updated'] / 1000
+            print(f"⚠️ 行情总线 {symbol} 已 {age:.0f}s 未更新，回退直连API")
+            return None
+        import pandas as pd
+        df = pd.DataFrame(snapshot['candles'][-limit:], columns=list(CANDLE_FIELDS))
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype('int64'), unit='ms')
+        return df
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+
+def attach_reader(name=None):
+    """尝试挂载总线，不存在时返回None（调用方回退到直连API）"""
+    name = name or os.environ.get("UMM_MARKET_BUS")
+    if not name:
+        return None
+    try:
+        return MarketDataReader(name)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+# ============ 发布进程 ============
+def run_publisher(symbols, name=DEFAULT_BUS_NAME, interval=60, bars=DEFAULT_MAX_BARS, top=0):
+    """
+    定期拉取行情并写入总线
+    top>0 时额外发布24h成交额前N的活跃USDT永续的K线(供Top5扫描使用)
+    """
+    from .monitor import OKXMonitor
+
+    monitor = OKXMonitor()
+    monitor.market_bus = None  # 发布者自己必须直连API
+    try:
+        publisher = MarketDataPublisher(symbols, name=name, max_bars=bars, interval=interval)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"📡 行情总线已启动: {name} ({len(symbols)} 个标的 + 活跃前{top}, {bars} 根K线)")
+    try:
+        while True:
+            started = time.time()
+            # 一次请求拿全部ticker
+            tickers = {}
+            data = monitor._request('GET', '/api/v5/market/tickers?instType=SWAP')
+            if data and data.get('code') == '0':
+                publisher.publish_tickers(data['data'])
+                tickers = {t['instId']: t for t in data['data']}
+
+            cycle = list(symbols)
+            if top:
+                cycle += [s for s in active_symbols(tickers.values(), limit=top) if s not in cycle]
+            published = 0
+            for symbol in cycle:
+                df = monitor.get_klines(symbol, limit=bars)
+                if df is None or len(df) == 0:
+                    continue
+                candles = list(zip(
+                    df['timestamp'].to_numpy().astype('datetime64[ms]').astype('int64').astype(float),
+                    df['open'], df['high'], df['low'], df['close'], df['vol']))
+                indicators = None
+                sig = monitor.calculate_signals(df)
+                if len(sig) > 0:
+                    indicators = {'support': sig['support'].iloc[-1],
+                                  'resistance': sig['resistance'].iloc[-1]}
+                try:
+                    publisher.publish(symbol, candles=candles, ticker=tickers.get(symbol),
+                                      indicators=indicators)
+                except ValueError as e:
+                    print(f"⚠️ {symbol}: {e}")
+                    continue
+                published += 1
+
+            print(f"[{datetime.now()}] 📡 已发布 {published}/{len(cycle)} 个标的，耗时 {time.time() - started:.1f}s")
+            time.sleep(max(0, interval - (time.time() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.close()
+
+
+def main():
+    import argparse
+    from .monitor import CONFIG
+
+    parser = argparse.ArgumentParser(description="共享内存行情总线发布进程")
+    parser.add_argument('--name', default=DEFAULT_BUS_NAME)
+    parser.add_argument('--interval', type=int, default=60)
+    parser.add_argument('--bars', type=int, default=DEFAULT_MAX_BARS)
+    parser.add_argument('--symbols', nargs='*', default=CONFIG['symbols'])
+    parser.add_argument('--top', type=int, default=30, help="额外发布24h成交额前N的活跃合约，0为关闭")
+    args = parser.parse_args()
+    run_publisher(args.symbols, name=args.name, interval=args.interval, bars=args.bars, top=args.top)
+
+
+if __name__ == '__main__':
+    main()
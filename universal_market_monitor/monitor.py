@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+OKX智能盯盘系统 V2
+功能：信号检测 + 价格警报 + 持仓监控 + 异常检测
+"""
+
+import os
+import json
+import time
+import hmac
+import base64
+import hashlib
+from datetime import datetime, timezone
+
+from .records import Position, to_jsonl
+from .rules import RuleEngine, EVENT_BAR, EVENT_POSITION, EVENT_BALANCE
+
+# requests / pandas 在首次使用时才导入，保证轻量入口的启动速度
+
+# ============ 配置 ============
+CONFIG = {
+    "leverage": 3,
+    "symbols": ["BTC-USDT-SWAP", "ETH-USDT-SWAP", "SOL-USDT-SWAP"],
+    "timeframe": "1H",
+    # SMC+SNR参数
+    "swing_lb": 30,
+    "pivot_lb": 2,
+    "snr_thresh": 0.08,
+    "stop_loss_pct": 0.033,
+    "take_profit_pct": 0.084,
+    "trend_period": 30,
+    # 仓位管理
+    "position_pct": 0.20,
+    "max_positions": 2,
+    "min_order_usdt": 3,
+    # 警报阈值
+    "price_alert_threshold": 0.02,  # 2%价格变动警报
+    "balance_change_threshold": 0.05,  # 5%余额变动警报
+    # 自适应异常检测（预热期内使用上面的固定阈值）
+    "anomaly_z_threshold": 4.0,  # 收益率超过 4σ (EWMA波动率)
+    "volume_z_threshold": 3.0,  # 成交量 z-score
+    "anomaly_min_samples": 20,
+    "price_min_move_pct": 0.005,  # 预热后仍需至少 0.5% 的价格变动
+    "balance_min_move_pct": 0.01,  # 预热后仍需至少 1% 的余额变动
+    # 警报规则（见 rules.py），config.json 中的 "rules" 会整体覆盖
+    # 未写明的阈值取上面的全局配置(stop_loss_pct / take_profit_pct / price_alert_threshold ...)
+    "rules": [
+        {"name": "support_resistance", "type": "sr_break"},
+        {"name": "price_change", "type": "price_change"},
+        {"name": "position_sl_tp", "type": "position_pnl"},
+        {"name": "exit_signal", "type": "exit_signal", "min_profit_pct": 5, "max_loss_pct": 3},
+    ],
+}
+
+# 指向本地模拟盘(paper.py)时设置 OKX_BASE_URL=http://127.0.0.1:8765，进程内模拟盘为 paper://
+BASE_URL = os.environ.get("OKX_BASE_URL", "https://www.okx.com")
+WORKSPACE = os.environ.get("UMM_WORKSPACE", os.path.expanduser("~/.openclaw/workspace"))
+
+
+def find_config_file():
+    """UMM_CONFIG 指定的文件，否则依次查找 当前目录、UMM_WORKSPACE 下的 config.json"""
+    if os.environ.get("UMM_CONFIG"):
+        return os.environ["UMM_CONFIG"]
+    for directory in (os.getcwd(), WORKSPACE):
+        path = os.path.join(directory, "config.json")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+CONFIG_FILE = find_config_file()
+
+
+def load_config(path=CONFIG_FILE):
+    """用 config.json 覆盖默认配置"""
+    if path and os.path.exists(path):
+        with open(path, 'r') as f:
+            CONFIG.update(json.load(f))
+    return CONFIG
+
+
+load_config()
+ALERT_LOG = os.path.join(WORKSPACE, "alert_log.jsonl")
+ALERT_LOG_MAX_BYTES = 1 << 20  # 超过后截断，只保留最近 ALERT_LOG_KEEP 条
+ALERT_LOG_KEEP = 1000
+TRADE_LOG = os.path.join(WORKSPACE, "trade_log.json")
+PRICE_STATS = os.path.join(WORKSPACE, "anomaly_price.npz")
+BALANCE_STATS = os.path.join(WORKSPACE, "anomaly_balance.npz")
+
+def append_alert_log(alerts):
+    """以JSON lines追加警报(单条或列表)，不读取旧日志；文件过大时截断"""
+    if not isinstance(alerts, (list, tuple)):
+        alerts = [alerts]
+    timestamp = datetime.now().isoformat()
+    for alert in alerts:
+        alert['timestamp'] = timestamp
+    os.makedirs(os.path.dirname(ALERT_LOG), exist_ok=True)
+    to_jsonl(alerts, ALERT_LOG)
+    if os.path.getsize(ALERT_LOG) > ALERT_LOG_MAX_BYTES:
+        with open(ALERT_LOG, 'r', encoding='utf-8') as f:
+            lines = f.readlines()[-ALERT_LOG_KEEP:]
+        tmp = ALERT_LOG + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        os.replace(tmp, ALERT_LOG)
+
+class OKXMonitor:
+    def __init__(self):
+        self.api_key = os.environ.get("OKX_API_KEY")
+        self.api_secret = os.environ.get("OKX_API_SECRET")
+        self.passphrase = os.environ.get("OKX_PASSPHRASE")
+        self.base_url = BASE_URL
+        self.last_prices = {}
+        self.last_balance = None
+        # 共享内存行情总线（设置 UMM_MARKET_BUS 时启用，见 market_data_bus.py）
+        from .market_data_bus import attach_reader
+        self.market_bus = attach_reader()
+        self._detectors = {}
+        self._rule_engine = None
+        
+    def _get_timestamp(self):
+        return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    
+    def _sign(self, timestamp, method, request_path, body=''):
+        message = timestamp + method.upper() + request_path + body
+        mac = hmac.new(self.api_secret.encode('utf-8'), message.encode('utf-8'), hashlib.sha256)
+        return base64.b64encode(mac.digest()).decode('utf-8')
+    
+    def _request(self, method, path, body=None):
+        if self.base_url.startswith('paper://'):
+            # 进程内模拟盘，无需签名与HTTP
+            from .paper import shared_exchange
+            return shared_exchange(self.base_url).request(method, path, body)
+        if not all([self.api_key, self.api_secret, self.passphrase]):
+            return None
+        timestamp = self._get_timestamp()
+        headers = {
+            'OK-ACCESS-KEY': self.api_key,
+            'OK-ACCESS-SIGN': self._sign(timestamp, method, path, json.dumps(body) if body else ''),
+            'OK-ACCESS-TIMESTAMP': timestamp,
+            'OK-ACCESS-PASSPHRASE': self.passphrase,
+            'Content-Type': 'application/json'
+        }
+        import requests
+        try:
+            url = self.base_url + path
+            if method == 'GET':
+                response = requests.get(url, headers=headers, timeout=10)
+            else:
+                response = requests.post(url, headers=headers, json=body, timeout=10)
+            return response.json()
+        except Exception as e:
+            print(f"❌ Request error: {e}")
+            return None
+    
+    # ============ 功能1: 价格警报 ============
+    def check_price_alerts(self):
+        """
+        监控价格突破支撑/阻力位 + 自适应波动/成交量异常
+        只分发 bar 事件: 固定阈值的 price_change(tick) 规则不在这里计算，涨跌幅由 AnomalyDetector 负责
+        """
+        alerts = []
+        quotes = {}
+        broken = set()
+        for symbol in CONFIG['symbols']:
+            df = self.get_klines(symbol, limit=100)
+            if df is None or len(df) < 50:
+                continue
+            
+            # 价格/成交量取原始K线: calculate_signals 的居中窗口会丢掉最近 swing_lb 根
+            current_price = df['close'].iloc[-1]
+            # 成交量取上一根已收盘K线
+            closed = df.iloc[-2]
+            quotes[symbol] = (current_price, closed['vol'], closed['timestamp'].timestamp())
+            
+            self.last_prices[symbol] = current_price
+            
+            # 计算支撑阻力: 需要至少 2*swing_lb+1 根K线
+            levels = self.calculate_signals(df)
+            if len(levels) == 0:
+                print(f"⚠️ {symbol} K线不足 {len(df)} 根，无法计算支撑阻力，跳过突破判断")
+                continue
+            latest = levels.iloc[-1]
+            
+            # 支撑/阻力突破等规则
+            for alert in self.get_rule_engine().dispatch({
+                'type': EVENT_BAR,
+                'symbol': symbol,
+                'price': current_price,
+                'support': latest['support'],
+                'resistance': latest['resistance'],
+            }):
+                if alert.type in ('breakout', 'breakdown'):
+                    broken.add(symbol)
+                alerts.append(alert)
+        
+        # 大幅波动/放量警报: 全部标的一次向量化更新
+        if quotes:
+            detector = self.get_anomaly_detector('price')
+            for alert in detector.update(quotes):
+                if alert.type == 'volatility' and alert.symbol in broken:
+                    continue
+                alerts.append(alert)
+            detector.save(PRICE_STATS)
+        
+        return alerts
+    
+    # ============ 功能2: 持仓监控 ============
+    def monitor_positions(self):
+        """监控持仓SL/TP状态"""
+        positions = self.get_positions()
+        alerts = []
+        
+        engine = self.get_rule_engine()
+        for pos in positions.values():
+            if pos.pos == 0:
+                continue
+            
+            alerts.extend(engine.dispatch({
+                'type': EVENT_POSITION,
+                'symbol': pos.inst_id,
+                'side': pos.pos_side,  # long / short / net
+                'pos': pos.pos,  # net模式下正数为多、负数为空
+                'entry_price': pos.avg_px,
+                'mark_price': pos.mark_px,
+            }))
+        
+        return alerts
+    
+    # ============ 功能3: 异常检测 ============
+    def detect_anomalies(self):
+        """检测账户异常变动"""
+        current_balance = self.get_account_balance()
+        if current_balance <= 0:
+            return []
+        
+        detector = self.get_anomaly_detector('balance')
+        alerts = detector.update({'USDT': current_balance}, kind='balance')
+        detector.save(BALANCE_STATS)
+        alerts.extend(self.get_rule_engine().dispatch({'type': EVENT_BALANCE, 'balance': current_balance}))
+        self.last_balance = current_balance
+        return alerts
+    
+    def get_rule_engine(self):
+        """按 CONFIG['rules'] 构建的规则引擎"""
+        if self._rule_engine is None:
+            self._rule_engine = RuleEngine.from_config(CONFIG['rules'], CONFIG)
+        return self._rule_engine
+    
+    def get_anomaly_detector(self, kind):
+        """按需加载流式异常检测器（状态跨进程持久化）"""
+        if kind not in self._detectors:
+            from .anomaly import AnomalyDetector
+            path, fallback, min_move = {
+                'price': (PRICE_STATS, CONFIG['price_alert_threshold'], CONFIG['price_min_move_pct']),
+                'balance': (BALANCE_STATS, CONFIG['balance_change_threshold'], CONFIG['balance_min_move_pct']),
+            }[kind]
+            self._detectors[kind] = AnomalyDetector.load(
+                path,
+                z_threshold=CONFIG['anomaly_z_threshold'],
+                volume_z_threshold=CONFIG['volume_z_threshold'],
+                min_samples=CONFIG['anomaly_min_samples'],
+                fallback_pct=fallback,
+                min_move_pct=min_move,
+            )
+        return self._detectors[kind]
+    
+    # ============ 原有方法 ============
+    def get_klines(self, symbol, limit=100):
+        if self.market_bus is not None:
+            df = self.market_bus.get_klines_df(symbol, limit)
+            if df is not None and len(df) >= min(limit, self.market_bus.max_bars):
+                return df
+        path = f"/api/v5/market/candles?instId={symbol}&bar={CONFIG['timeframe']}&limit={limit}"
+        data = self._request('GET', path)
+        if data and data.get('code') == '0':
+            import pandas as pd
+            df = pd.DataFrame(data['data'], columns=['timestamp', 'open', 'high', 'low', 'close', 'vol', 'volCcy', 'volCcyQuote', 'confirm'])
+            df[['open', 'high', 'low', 'close', 'vol']] = df[['open', 'high', 'low', 'close', 'vol']].astype(float)
+            df['timestamp'] = pd.to_datetime(df['timestamp'].astype(int), unit='ms')
+            return df.iloc[::-1].reset_index(drop=True)
+        return None
+    
+    def calculate_signals(self, df):
+        cfg = CONFIG
+        df = df.copy()
+        swing_w = cfg["swing_lb"] * 2 + 1
+        df['swing_high'] = df['high'].rolling(window=swing_w, center=True).max()
+        df['swing_low'] = df['low'].rolling(window=swing_w, center=True).min()
+        pivot_w = cfg["pivot_lb"] * 2 + 1
+        df['pivot_high'] = df['high'].rolling(window=pivot_w, center=True).max()
+        df['pivot_low'] = df['low'].rolling(window=pivot_w, center=True).min()
+        df['resistance'] = df.loc[df['high'] == df['pivot_high'], 'high'].reindex(df.index).ffill().bfill()
+        df['support'] = df.loc[df['low'] == df['pivot_low'], 'low'].reindex(df.index).ffill().bfill()
+        return df.dropna()
+    
+    def get_account_balance(self):
+        data = self._request('GET', '/api/v5/account/balance')
+        if data and data.get('code') == '0':
+            for detail in data['data'][0].get('details', []):
+                if detail['ccy'] == 'USDT':
+                    return float(detail['availBal'])
+        return 0
+    
+    def get_positions(self):
+        data = self._request('GET', '/api/v5/account/positions')
+        if data and data.get('code') == '0':
+            return {p['instId']: Position.from_okx(p) for p in data['data']}
+        return {}
+    
+    def log_alert(self, alerts):
+        """记录警报(单条或列表)"""
+        append_alert_log(alerts)
+    
+    def run_monitoring_cycle(self):
+        """运行完整监控周期"""
+        print(f"\n[{datetime.now()}] 🔍 开始监控...")
+        
+        all_alerts = []
+        
+        # 1. 价格警报
+        price_alerts = self.check_price_alerts()
+        all_alerts.extend(price_alerts)
+        
+        # 2. 持仓监控
+        position_alerts = self.monitor_positions()
+        all_alerts.extend(position_alerts)
+        
+        # 3. 异常检测
+        anomaly_alerts = self.detect_anomalies()
+        all_alerts.extend(anomaly_alerts)
+        
+        # 输出并记录警报
+        if all_alerts:
+            print(f"\n🚨 检测到 {len(all_alerts)} 个警报:")
+            for alert in all_alerts:
+                print(f"  {alert.message}")
+            self.log_alert(all_alerts)
+        else:
+            print("  ✅ 一切正常")
+        
+        return all_alerts
+
+def main():
+    monitor = OKXMonitor()
+    monitor.run_monitoring_cycle()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+模拟盘 - 本地 OKX 兼容 REST 替身
+
+用历史K线(history.py 的本地库)或随机游走行情回放，撮合下单并维护持仓/余额。
+监控程序不改任何代码，只需:
+  export OKX_BASE_URL=http://127.0.0.1:8765
+  export OKX_API_KEY=paper OKX_API_SECRET=paper OKX_PASSPHRASE=paper
+签名不做校验。需要每秒数千单时用进程内模式，OKXMonitor._request 直接路由到 PaperExchange.request:
+  export OKX_BASE_URL=paper://                          # 随机游走行情
+  export OKX_BASE_URL=paper:///path/to/history.sqlite   # 回放本地K线库
+
+简化: 合约面值按1个基础币计；市价单和可立即成交的限价单按最新价成交；
+挂单在K线最高/最低价穿过挂单价时按挂单价成交(跳空时按开盘价)；
+挂单按挂单价冻结开仓保证金，撤单/成交时释放；仓位模式支持 long/short(双向) 与 net(单向)。
+ordType 支持 market/limit/post_only/ioc/fok: post_only 会立即成交时拒单，ioc/fok 不能立即成交时撤销
+(成交总是全量，fok 与 ioc 等价)；双向持仓下无对应持仓的平仓单拒单。
+"""
+
+import json
+import heapq
+import random
+import threading
+import time
+from itertools import count
+from urllib.parse import urlparse, parse_qs
+
+from .monitor import CONFIG
+from .history import BAR_MS
+
+DEFAULT_PORT = 8765
+DEFAULT_BALANCE = 10000.0
+TAKER_FEE = 0.0005
+MAKER_FEE = 0.0002
+WARMUP_BARS = 150  # get_klines(limit=150) 需要的历史长度
+ORDER_TYPES = ('market', 'limit', 'post_only', 'ioc', 'fok')
+
+
+def _ok(data):
+    return {'code': '0', 'msg': '', 'data': data}
+
+
+def _error(code, msg):
+    return {'code': code, 'msg': msg, 'data': []}
+
+
+def _num(value):
+    """OKX 接口里数字都是字符串"""
+    return f"{value:.10g}"
+
+
+def synthetic_candles(bars, start_price=100.0, bar_ms=3_600_000, volatility=0.01, seed=None):
+    """随机游走K线，无历史数据时使用"""
+    rng = random.Random(seed)
+    start_ts = int(time.time() * 1000) // bar_ms * bar_ms - bars * bar_ms
+    price = start_price
+    rows = []
+    for i in range(bars):
+        open_ = price
+        close = open_ * (1 + rng.gauss(0, volatility))
+        high = max(open_, close) * (1 + abs(rng.gauss(0, volatility / 2)))
+        low = min(open_, close) * (1 - abs(rng.gauss(0, volatility / 2)))
+        rows.append((start_ts + i * bar_ms, open_, high, low, close, rng.uniform(1000, 5000)))
+        price = close
+    return rows
+
+
+class PaperExchange:
+    """撮合与账户状态；所有公开方法线程安全"""
+
+    def __init__(self, candles, balance=DEFAULT_BALANCE, leverage=None, warmup=WARMUP_BARS,
+                 taker_fee=TAKER_FEE, maker_fee=MAKER_FEE, bar=None):
+        """candles: {instId: [(ts, open, high, low, close, vol), ...]} 按时间升序，周期为 bar"""
+        self.candles = {inst: list(rows) for inst, rows in candles.items() if rows}
+        self.cursor = {inst: min(warmup, len(rows)) - 1 for inst, rows in self.candles.items()}
+        self.bar_ms = BAR_MS[bar or CONFIG['timeframe']]
+        self.cash = float(balance)
+        self.frozen = 0.0  # 挂单冻结的保证金
+        self.leverage = float(leverage or CONFIG['leverage'])
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.positions = {}  # (instId, posSide) -> {'pos', 'avgPx'}，net模式下pos带符号
+        self.orders = {}  # ordId -> order dict
+        self.bids = {}  # instId -> heap[(-px, seq, ordId)]
+        self.asks = {}  # instId -> heap[(px, seq, ordId)]
+        self.fills = 0
+        self._ids = count(1)
+        self.lock = threading.RLock()
+
+    # ============ 行情 ============
+    def last_price(self, inst):
+        return self.candles[inst][self.cursor[inst]][4]
+
+    def advance(self, bars=1):
+        """所有标的前进N根K线并撮合挂单，返回本次成交数"""
+        filled = 0
+        with self.lock:
+            for _ in range(bars):
+                for inst, rows in self.candles.items():
+                    if self.cursor[inst] + 1 >= len(rows):
+                        continue
+                    self.cursor[inst] += 1
+                    filled += self._match(inst, rows[self.cursor[inst]])
+        return filled
+
+    def _match(self, inst, bar):
+        """用一根K线的最高/最低价撮合挂单，跳空越过挂单价时按开盘价成交"""
+        _, open_, high, low, _, _ = bar
+        filled = 0
+        bids = self.bids.get(inst)
+        while bids and -bids[0][0] >= low:
+            _, _, ord_id = heapq.heappop(bids)
+            filled += self._fill_resting(ord_id, open_)
+        asks = self.asks.get(inst)
+        while asks and asks[0][0] <= high:
+            _, _, ord_id = heapq.heappop(asks)
+            filled += self._fill_resting(ord_id, open_)
+        return filled
+
+    def _fill_resting(self, ord_id, open_):
+        order = self.orders[ord_id]
+        if order['state'] != 'live':
+            return 0  # 已撤单，懒删除
+        self._release(order)
+        px = min(order['px'], open_) if order['side'] == 'buy' else max(order['px'], open_)
+        # 挂单期间持仓/余额可能已变化，成交前按成交价重新检查保证金
+        if self._opening_margin(order, px) > self._avail_balance():
+            order['state'] = 'canceled'
+            return 0
+        return self._fill(order, px, self.maker_fee)
+
+    def _bars(self, inst, step):
+        """已回放部分按 step 毫秒聚合，新→旧产出 [ts, open, high, low, close, vol]"""
+        rows = self.candles[inst]
+        group = None
+        for i in range(self.cursor[inst], -1, -1):
+            ts, open_, high, low, close, vol = rows[i]
+            start = ts - ts % step
+            if group is not None and group[0] != start:
+                yield group
+                group = None
+            if group is None:
+                group = [start, open_, high, low, close, vol]
+            else:
+                group[1] = open_  # 倒序遍历，最后一次赋值为最早一根的开盘价
+                group[2] = max(group[2], high)
+                group[3] = min(group[3], low)
+                group[5] += vol
+        if group is not None:
+            yield group
+
+    def _candle_rows(self, inst, limit, after=None, before=None, bar=None):
+        """已回放部分的K线，新→旧，与OKX一致；bar 须为回放周期的整数倍"""
+        rows = self.candles.get(inst)
+        if not rows:
+            return []
+        step = BAR_MS[bar] if bar else self.bar_ms
+        if step % self.bar_ms:
+            raise ValueError(f"bar {bar} 不是回放周期的整数倍")
+        out = []
+        for ts, open_, high, low, close, vol in self._bars(inst, step):
+            if after is not None and ts >= after:
+                continue
+            if before is not None and ts <= before:
+                break
+            # 只有包含最新一根回放K线的那根未收盘
+            confirm = '0' if not out and after is None else '1'
+            out.append([str(ts), _num(open_), _num(high), _num(low), _num(close), _num(vol),
+                        _num(vol * close), _num(vol * close), confirm])
+            if len(out) >= limit:
+                break
+        return out
+
+    # ============ 交易 ============
+    def place_order(self, inst, side, sz, ord_type='market', px=None, pos_side='net', cl_ord_id=''):
+        """返回 (ordId, sCode, sMsg)"""
+        with self.lock:
+            if inst not in self.candles:
+                return '', '51001', 'Instrument ID does not exist'
+            if side not in ('buy', 'sell') or sz <= 0:
+                return '', '51000', 'Parameter error'
+            if ord_type not in ORDER_TYPES:
+                return '', '51000', 'Parameter ordType error'
+            if ord_type != 'market' and not px:
+                return '', '51000', 'Parameter px error'
+            closing = (pos_side == 'long' and side == 'sell') or (pos_side == 'short' and side == 'buy')
+            if closing and self.positions.get((inst, pos_side), {'pos': 0.0})['pos'] <= 0:
+                return '', '51169', "Order failed because you don't have any positions in this direction"
+            ord_id = str(next(self._ids))
+            order = {'ordId': ord_id, 'clOrdId': cl_ord_id, 'instId': inst, 'side': side,
+                     'posSide': pos_side or 'net', 'ordType': ord_type, 'sz': sz,
+                     'px': px, 'state': 'live', 'fillPx': 0.0, 'accFillSz': 0.0,
+                     'cTime': self.candles[inst][self.cursor[inst]][0]}
+            last = self.last_price(inst)
+            marketable = ord_type == 'market' or (
+                (side == 'buy' and px >= last) or (side == 'sell' and px <= last))
+            if ord_type == 'post_only' and marketable:
+                return '', '51000', 'Post only order would take liquidity'
+            if ord_type in ('ioc', 'fok') and not marketable:
+                order['state'] = 'canceled'  # 不能立即成交的部分(即全部)撤销
+                self.orders[ord_id] = order
+                return ord_id, '0', ''
+            # 可立即成交的单按最新价吃单，否则按挂单价冻结保证金
+            margin = self._opening_margin(order, last if marketable else px)
+            if margin > self._avail_balance():
+                return '', '51008', 'Order failed. Insufficient balance'
+            self.orders[ord_id] = order
+            if marketable:
+                self._fill(order, last, self.taker_fee)
+            else:
+                order['frozen'] = margin
+                self.frozen += margin
+                book = self.bids if side == 'buy' else self.asks
+                key = -px if side == 'buy' else px
+                heapq.heappush(book.setdefault(inst, []), (key, int(ord_id), ord_id))
+            return ord_id, '0', ''
+
+    def cancel_order(self, ord_id):
+        with self.lock:
+            order = self.orders.get(ord_id)
+            if order is None:
+                return '51400', 'Order does not exist'
+            if order['state'] != 'live':
+                return '51402', 'Order has been completed or canceled'
+            order['state'] = 'canceled'
+            self._release(order)
+            return '0', ''
+
+    def _release(self, order):
+        """释放挂单冻结的保证金"""
+        self.frozen -= order.pop('frozen', 0.0)
+
+    def _opening_margin(self, order, px):
+        """本单新开仓部分所需保证金（平仓部分不占用）"""
+        key = (order['instId'], order['posSide'])
+        current = self.positions.get(key, {'pos': 0.0})['pos']
+        if order['posSide'] == 'long':
+            opening = order['sz'] if order['side'] == 'buy' else 0.0
+        elif order['posSide'] == 'short':
+            opening = order['sz'] if order['side'] == 'sell' else 0.0
+        else:
+            signed = order['sz'] if order['side'] == 'buy' else -order['sz']
+            opening = max(0.0, abs(signed) - abs(current)) if current * signed < 0 else order['sz']
+        return opening * px / self.leverage + order['sz'] * px * self.taker_fee
+
+    def _fill(self, order, px, fee_rate):
+        inst, pos_side, sz = order['instId'], order['posSide'], order['sz']
+        key = (inst, pos_side)
+        position = self.positions.setdefault(key, {'pos': 0.0, 'avgPx': 0.0})
+        if pos_side == 'net':
+            signed = sz if order['side'] == 'buy' else -sz
+        elif pos_side == 'long':
+            signed = sz if order['side'] == 'buy' else -min(sz, position['pos'])
+        else:
+            signed = sz if order['side'] == 'sell' else -min(sz, position['pos'])
+        if signed == 0:
+            order['state'] = 'canceled'  # 挂单期间持仓已被平掉
+            return 0
+
+        pos, avg = position['pos'], position['avgPx']
+        direction = -1.0 if pos_side == 'short' else 1.0
+        if pos == 0 or (pos > 0) == (signed > 0):
+            # 加仓
+            new_pos = pos + signed
+            position['avgPx'] = (avg * abs(pos) + px * abs(signed)) / abs(new_pos)
+        else:
+            # 减仓/平仓，net模式可能反手
+            closed = min(abs(signed), abs(pos))
+            sign = 1.0 if pos > 0 else -1.0
+            self.cash += (px - avg) * closed * sign * direction
+            new_pos = pos + signed
+            if new_pos != 0 and (new_pos > 0) != (pos > 0):
+                position['avgPx'] = px
+        position['pos'] = new_pos
+        if new_pos == 0:
+            position['avgPx'] = 0.0
+
+        traded = abs(signed) if pos_side != 'net' else sz
+        self.cash -= traded * px * fee_rate
+        order['state'] = 'filled'
+        order['fillPx'] = px
+        order['accFillSz'] = traded
+        self.fills += 1
+        return 1
+
+    # ============ 账户 ============
+    def _position_views(self):
+        views = []
+        for (inst, pos_side), position in self.positions.items():
+            pos = position['pos']
+            if pos == 0:
+                continue
+            mark = self.last_price(inst)
+            avg = position['avgPx']
+            if pos_side == 'short':
+                upl = (avg - mark) * pos
+            else:
+                upl = (mark - avg) * pos  # long 或 net(带符号)
+            imr = abs(pos) * avg / self.leverage
+            views.append({'instId': inst, 'posSide': pos_side, 'pos': pos, 'avgPx': avg,
+                          'markPx': mark, 'upl': upl, 'uplRatio': upl / imr if imr else 0.0,
+                          'imr': imr, 'lever': self.leverage})
+        return views
+
+    def _avail_balance(self):
+        views = self._position_views()
+        return (self.cash + sum(min(v['upl'], 0) for v in views) - sum(v['imr'] for v in views)
+                - self.frozen)
+
+    # ============ REST 路由 ============
+    def request(self, method, path, body=None):
+        """与 OKXMonitor._request 同签名，返回解析后的JSON"""
+        url = urlparse(path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        handler = self.ROUTES.get((method.upper(), url.path))
+        if handler is None:
+            return _error('50000', f'Unsupported endpoint {method} {url.path}')
+        try:
+            return handler(self, query, body or {})
+        except (KeyError, ValueError, TypeError) as e:
+            return _error('51000', f'Parameter error: {e}')
+
+    def _get_candles(self, query, body):
+        limit = min(int(query.get('limit', 100)), 300)
+        after = int(query['after']) if 'after' in query else None
+        before = int(query['before']) if 'before' in query else None
+        with self.lock:
+            return _ok(self._candle_rows(query['instId'], limit, after, before, query.get('bar')))
+
+    def _ticker(self, inst):
+        rows = self.candles[inst]
+        i = self.cursor[inst]
+        day = rows[max(0, i + 1 - max(1, 86_400_000 // self.bar_ms)):i + 1]
+        last = rows[i][4]
+        return {'instType': 'SWAP', 'instId': inst, 'last': _num(last),
+                'bidPx': _num(last * 0.9999), 'askPx': _num(last * 1.0001),
+                'vol24h': _num(sum(r[5] for r in day)),
+                'volCcy24h': _num(sum(r[5] * r[4] for r in day)), 'ts': str(rows[i][0])}
+
+    def _get_tickers(self, query, body):
+        with self.lock:
+            return _ok([self._ticker(inst) for inst in self.candles])
+
+    def _get_ticker(self, query, body):
+        with self.lock:
+            inst = query['instId']
+            return _ok([self._ticker(inst)] if inst in self.candles else [])
+
+    def _get_balance(self, query, body):
+        with self.lock:
+            views = self._position_views()
+            eq = self.cash + sum(v['upl'] for v in views)
+            avail = self._avail_balance()
+            cash = self.cash
+            frozen = self.frozen
+        return _ok([{'totalEq': _num(eq), 'details': [
+            {'ccy': 'USDT', 'eq': _num(eq), 'cashBal': _num(cash), 'availBal': _num(avail),
+             'ordFrozen': _num(frozen)}]}])
+
+    def _get_positions(self, query, body):
+        with self.lock:
+            views = self._position_views()
+        inst = query.get('instId')
+        return _ok([{k: (_num(v) if isinstance(v, float) else v) for k, v in view.items()}
+                    | {'instType': 'SWAP', 'mgnMode': 'cross'}
+                    for view in views if inst is None or view['instId'] == inst])
+
+    def _order_view(self, order):
+        return {'instId': order['instId'], 'ordId': order['ordId'], 'clOrdId': order['clOrdId'],
+                'side': order['side'], 'posSide': order['posSide'], 'ordType': order['ordType'],
+                'sz': _num(order['sz']), 'px': _num(order['px']) if order['px'] else '',
+                'state': order['state'], 'fillPx': _num(order['fillPx']) if order['fillPx'] else '',
+                'accFillSz': _num(order['accFillSz']), 'cTime': str(order['cTime'])}
+
+    def _get_order(self, query, body):
+        with self.lock:
+            order = self.orders.get(query['ordId'])
+            return _ok([self._order_view(order)]) if order else _error('51603', 'Order does not exist')
+
+    def _get_pending(self, query, body):
+        inst = query.get('instId')
+        with self.lock:
+            return _ok([self._order_view(o) for o in self.orders.values()
+                        if o['state'] == 'live' and (inst is None or o['instId'] == inst)])
+
+    def _post_order(self, query, body):
+        ord_id, code, msg = self.place_order(
+            body['instId'], body['side'], float(body['sz']), body.get('ordType', 'market'),
+            float(body['px']) if body.get('px') else None, body.get('posSide', 'net'),
+            body.get('clOrdId', ''))
+        result = {'ordId': ord_id, 'clOrdId': body.get('clOrdId', ''), 'sCode': code, 'sMsg': msg}
+        return _ok([result]) if code == '0' else {'code': '1', 'msg': msg, 'data': [result]}
+
+    def _post_batch(self, query, body):
+        data = [self._post_order(query, item)['data'][0] for item in body]
+        return _ok(data) if all(d['sCode'] == '0' for d in data) else {'code': '2', 'msg': '', 'data': data}
+
+    def _post_cancel(self, query, body):
+        code, msg = self.cancel_order(body['ordId'])
+        result = {'ordId': body['ordId'], 'sCode': code, 'sMsg': msg}
+        return _ok([result]) if code == '0' else {'code': '1', 'msg': msg, 'data': [result]}
+
+    def _post_advance(self, query, body):
+        """模拟盘专用: 回放前进N根K线"""
+        filled = self.advance(int(body.get('bars', 1)))
+        return _ok([{'filled': filled, 'cursor': dict(self.cursor)}])
+
+    ROUTES = {
+        ('GET', '/api/v5/market/candles'): _get_candles,
+        ('GET', '/api/v5/market/history-candles'): _get_candles,
+        ('GET', '/api/v5/market/tickers'): _get_tickers,
+        ('GET', '/api/v5/market/ticker'): _get_ticker,
+        ('GET', '/api/v5/account/balance'): _get_balance,
+        ('GET', '/api/v5/account/positions'): _get_positions,
+        ('GET', '/api/v5/trade/order'): _get_order,
+        ('GET', '/api/v5/trade/orders-pending'): _get_pending,
+        ('POST', '/api/v5/trade/order'): _post_order,
+        ('POST', '/api/v5/trade/batch-orders'): _post_batch,
+        ('POST', '/api/v5/trade/cancel-order'): _post_cancel,
+        ('POST', '/sim/advance'): _post_advance,
+    }
+
+
+# ============ HTTP 服务 ============
+def make_server(exchange, host='127.0.0.1', port=DEFAULT_PORT):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive，requests.Session 可复用连接
+        disable_nagle_algorithm = True  # 头和body分两次写，不关Nagle会被延迟ACK卡住40ms
+
+        def _reply(self, payload):
+            raw = json.dumps(payload).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self):
+            self._reply(exchange.request('GET', self.path))
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                return self._reply(_error('50002', 'JSON syntax error'))
+            self._reply(exchange.request('POST', self.path, body))
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+# ============ 进程内模式 (OKX_BASE_URL=paper://) ============
+_EXCHANGES = {}
+_EXCHANGES_LOCK = threading.Lock()
+
+
+def load_candles(symbols, bar=None, db=None, bars=2000):
+    """回放数据: 指定 history.py 本地库时读库，否则生成随机游走行情"""
+    bar = bar or CONFIG['timeframe']
+    if db:
+        from .history import HistoryStore
+        store = HistoryStore(db)
+        try:
+            return {s: store.rows(s, bar) for s in symbols}
+        finally:
+            store.close()
+    return {s: synthetic_candles(bars, bar_ms=BAR_MS[bar], seed=s) for s in symbols}
+
+
+def shared_exchange(url):
+    """按 paper:// URL 取进程内共享的模拟盘；paper:///path/history.sqlite 回放本地K线库"""
+    with _EXCHANGES_LOCK:
+        exchange = _EXCHANGES.get(url)
+        if exchange is None:
+            db = urlparse(url).path or None
+            exchange = _EXCHANGES[url] = PaperExchange(load_candles(CONFIG['symbols'], db=db))
+        return exchange
+
+
+def benchmark(exchange, orders=20000):
+    """经 OKXMonitor._request(paper://) 的进程内下单压测，返回每秒订单数"""
+    from .monitor import OKXMonitor
+    # python -m 运行时本模块是 __main__，需注册到 _request 导入的包内模块
+    from .paper import _EXCHANGES
+
+    url = f"paper://bench-{id(exchange)}"
+    _EXCHANGES[url] = exchange
+    monitor = OKXMonitor()
+    monitor.base_url = url
+    insts = list(exchange.candles)
+    rng = random.Random(0)
+    started = time.perf_counter()
+    for i in range(orders):
+        inst = insts[i % len(insts)]
+        last = exchange.last_price(inst)
+        side = rng.choice(('buy', 'sell'))
+        if i % 2:
+            body = {'instId': inst, 'side': side, 'posSide': 'net', 'ordType': 'market', 'sz': '0.001'}
+        else:
+            px = last * (0.99 if side == 'buy' else 1.01)
+            body = {'instId': inst, 'side': side, 'posSide': 'net', 'ordType': 'limit',
+                    'sz': '0.001', 'px': str(px)}
+        monitor._request('POST', '/api/v5/trade/order', body)
+        if i % 1000 == 999:
+            monitor._request('POST', '/sim/advance', {'bars': 1})
+    elapsed = time.perf_counter() - started
+    del _EXCHANGES[url]
+    return orders / elapsed
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="本地OKX兼容模拟盘")
+    parser.add_argument('--symbols', nargs='*', default=CONFIG['symbols'])
+    parser.add_argument('--bar', default=CONFIG['timeframe'])
+    parser.add_argument('--db', help="history.py 下载的本地K线库，缺省使用随机游走行情")
+    parser.add_argument('--bars', type=int, default=2000, help="随机游走行情的K线数量")
+    parser.add_argument('--balance', type=float, default=DEFAULT_BALANCE)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--step-seconds', type=float, default=0,
+                        help="每隔N秒自动前进一根K线，0表示只能通过 POST /sim/advance 推进")
+    parser.add_argument('--bench', type=int, default=0, help="只做进程内下单压测的订单数")
+    args = parser.parse_args()
+
+    candles = load_candles(args.symbols, args.bar, args.db, args.bars)
+    exchange = PaperExchange(candles, balance=args.balance, bar=args.bar)
+    if not exchange.candles:
+        print("❌ 没有可回放的K线")
+        return
+
+    if args.bench:
+        rate = benchmark(exchange, args.bench)
+        print(f"⚡ {args.bench} 笔订单(经 OKXMonitor._request)，{rate:,.0f} 单/秒，成交 {exchange.fills} 笔")
+        return
+
+    if args.step_seconds > 0:
+        def stepper():
+            while True:
+                time.sleep(args.step_seconds)
+                exchange.advance()
+        threading.Thread(target=stepper, daemon=True).start()
+
+    server = make_server(exchange, args.host, args.port)
+    print(f"🧪 模拟盘已启动: http://{args.host}:{args.port} ({len(exchange.candles)} 个标的)")
+    print(f"   export OKX_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+轻量价格警报 - 只用标准库，不加载 pandas / numpy / requests
+适合每5分钟由定时任务拉起：一次ticker请求（或读共享内存总线）完成全部标的的检查
+涨跌幅按 price_change 规则的固定阈值判断，不做自适应波动检测(需要numpy，见 monitor.py / anomaly.py)
+"""
+
+import os
+import json
+
+from .monitor import CONFIG, WORKSPACE, BASE_URL, append_alert_log
+from .rules import RuleEngine, EVENT_TICK
+
+TICKERS_URL = BASE_URL + "/api/v5/market/tickers?instType=SWAP"
+PRICE_STATE = os.path.join(WORKSPACE, "price_alert_state.json")
+
+
+def fetch_prices(symbols):
+    """获取最新价与支撑/阻力: {symbol: {'price', 'support', 'resistance'}}"""
+    prices = {}
+    if os.environ.get("UMM_MARKET_BUS"):
+        from .market_data_bus import attach_reader
+        bus = attach_reader()
+        if bus is not None:
+            for symbol in symbols:
+                snapshot = bus.read(symbol, fresh_only=True)
+                if snapshot and snapshot['ticker']['last'] > 0:
+                    prices[symbol] = {
+                        'price': snapshot['ticker']['last'],
+                        'support': snapshot['indicators']['support'] or None,
+                        'resistance': snapshot['indicators']['resistance'] or None,
+                    }
+            bus.close()
+    missing = set(symbols) - set(prices)
+    if not missing:
+        return prices
+
+    # 总线不可用/过期的标的走公共行情接口，无需签名
+    if BASE_URL.startswith('paper://'):
+        from .paper import shared_exchange
+        data = shared_exchange(BASE_URL).request('GET', '/api/v5/market/tickers?instType=SWAP')
+    else:
+        from urllib.request import urlopen
+        try:
+            with urlopen(TICKERS_URL, timeout=10) as response:
+                data = json.load(response)
+        except Exception as e:
+            print(f"❌ Request error: {e}")
+            return prices
+    if data.get('code') != '0':
+        return prices
+    prices.update({t['instId']: {'price': float(t['last']), 'support': None, 'resistance': None}
+                   for t in data['data'] if t['instId'] in missing})
+    return prices
+
+
+def load_state():
+    if os.path.exists(PRICE_STATE):
+        with open(PRICE_STATE, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state):
+    os.makedirs(os.path.dirname(PRICE_STATE), exist_ok=True)
+    with open(PRICE_STATE, 'w') as f:
+        json.dump(state, f)
+
+
+def check_price_alerts(prices, last_prices, engine=None):
+    """按 CONFIG['rules'] 中订阅 tick 事件的规则检查，上一次价格来自状态文件"""
+    engine = engine or RuleEngine.from_config(CONFIG['rules'], CONFIG)
+    alerts = []
+    for symbol, quote in prices.items():
+        event = {'type': EVENT_TICK, 'symbol': symbol, **quote}
+        if symbol in last_prices:
+            event['prev_price'] = last_prices[symbol]
+        fired = engine.dispatch(event)
+        # 已报突破时不再重复报波动
+        if any(a.type in ('breakout', 'breakdown') for a in fired):
+            fired = [a for a in fired if a.type != 'volatility']
+        alerts.extend(fired)
+    return alerts
+
+
+def main():
+    prices = fetch_prices(CONFIG['symbols'])
+    state = load_state()
+    alerts = check_price_alerts(prices, state)
+
+    if alerts:
+        print(f"🚨 检测到 {len(alerts)} 个价格警报:")
+        for alert in alerts:
+            print(f"  {alert.message}")
+        append_alert_log(alerts)
+    else:
+        print("✅ 价格正常")
+
+    state.update({symbol: quote['price'] for symbol, quote in prices.items()})
+    save_state(state)
+    return alerts
+
+
+if __name__ == '__main__':
+    main()
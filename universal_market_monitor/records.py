@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+统一的数据记录类型: 信号 / 警报 / 持仓 / 挂单评估
+
+使用 __slots__ 数据类代替重复键名的dict: 对象没有 __dict__，字段名不随每条记录存储，
+内存固定(Alert 15个字段约152字节，同样内容的5键dict约184字节)，字段拼写错误会直接报错；
+同时保留 record['key'] / record.get('key') 访问方式，旧代码与飞书通知无需改动。
+批量数据可用 to_array() 转成 NumPy 结构化数组，to_jsonl() 写成JSON lines。
+"""
+
+import json
+from dataclasses import dataclass, fields
+
+
+def _json_default(value):
+    # numpy 标量 / pandas Timestamp
+    if hasattr(value, 'item'):
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} 无法序列化")
+
+
+class _Record:
+    """映射式访问与序列化，字段值为None视为不存在（与原dict缺键一致）"""
+
+    __slots__ = ()
+    _aliases = {}  # 外部键名 -> 字段名（如 OKX 的 instId）
+
+    def __getitem__(self, key):
+        name = self._aliases.get(key, key)
+        if name in self.__dataclass_fields__ and name != 'extra':
+            value = getattr(self, name)
+            if value is not None:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        name = self._aliases.get(key, key)
+        if name in self.__dataclass_fields__ and name != 'extra':
+            setattr(self, name, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self):
+        data = {f.name: getattr(self, f.name) for f in fields(self)
+                if f.name != 'extra' and getattr(self, f.name) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=_json_default)
+
+
+@dataclass(slots=True)
+class Signal(_Record):
+    """交易信号 (generate_trading_signals)"""
+    type: str  # BUY / SELL
+    symbol: str
+    entry_price: float
+    stop_loss: float
+    take_profit: float
+    confidence: int
+    reason: str = None
+    extra: dict = None
+
+
+@dataclass(slots=True)
+class Alert(_Record):
+    """监控警报 / 离场提醒"""
+    type: str
+    message: str = None
+    symbol: str = None
+    price: float = None
+    level: float = None
+    change_pct: float = None
+    side: str = None
+    pnl_pct: float = None
+    balance: float = None
+    volume: float = None
+    zscore: float = None
+    suggestion: str = None
+    rule: str = None
+    timestamp: str = None
+    extra: dict = None
+
+
+@dataclass(slots=True)
+class Position(_Record):
+    """持仓，只保留监控用到的字段，不再保存完整的OKX原始JSON"""
+    inst_id: str
+    pos_side: str
+    pos: float = 0.0
+    avg_px: float = 0.0
+    mark_px: float = 0.0
+    upl: float = 0.0
+    upl_ratio: float = 0.0
+    lever: float = 0.0
+    extra: dict = None
+
+    _aliases = {'instId': 'inst_id', 'posSide': 'pos_side', 'avgPx': 'avg_px',
+                'markPx': 'mark_px', 'uplRatio': 'upl_ratio'}
+
+    @classmethod
+    def from_okx(cls, raw):
+        def num(key):
+            return float(raw.get(key) or 0)
+        return cls(raw['instId'], raw.get('posSide', 'net'), num('pos'), num('avgPx'),
+                   num('markPx'), num('upl'), num('uplRatio'), num('lever'))
+
+
+@dataclass(slots=True)
+class OrderEvaluation(_Record):
+    """挂单位置评估 (evaluate_pending_orders)"""
+    symbol: str
+    order_price: float
+    current_price: float
+    side: str
+    rating: str = None
+    comment: str = None
+    extra: dict = None
+
+
+# ============ 批量序列化 ============
+def to_jsonl(records, fp):
+    """写入JSON lines(追加)，fp 为文件路径或已打开的文本文件；普通dict也可写入"""
+    if isinstance(fp, str):
+        with open(fp, 'a', encoding='utf-8') as f:
+            return to_jsonl(records, f)
+    count = 0
+    for record in records:
+        if isinstance(record, _Record):
+            fp.write(record.to_json())
+        else:
+            fp.write(json.dumps(record, ensure_ascii=False, default=_json_default))
+        fp.write('\n')
+        count += 1
+    return count
+
+
+def from_jsonl(cls, fp):
+    """从JSON lines读回记录，未知键进入 extra"""
+    if isinstance(fp, str):
+        with open(fp, 'r', encoding='utf-8') as f:
+            return from_jsonl(cls, f)
+    names = {f.name for f in fields(cls)} - {'extra'}
+    records = []
+    for line in fp:
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        known = {k: v for k, v in data.items() if k in names}
+        extra = {k: v for k, v in data.items() if k not in names} or None
+        records.append(cls(**known, extra=extra))
+    return records
+
+
+def to_array(records, cls=None):
+    """同类记录转为 NumPy 结构化数组（数值列连续存储，适合批量计算）；空列表需指定 cls 才有列"""
+    import numpy as np
+
+    records = list(records)
+    if cls is None:
+        if not records:
+            return np.recarray(0, dtype=[])
+        cls = type(records[0])
+    columns = []
+    names = []
+    for f in fields(cls):
+        if f.name == 'extra':
+            continue
+        values = [getattr(r, f.name) for r in records]
+        if f.type is float:
+            column = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        elif f.type is int:
+            column = np.array([0 if v is None else v for v in values], dtype=np.int64)
+        else:
+            column = np.array(['' if v is None else str(v) for v in values], dtype=str)
+        names.append(f.name)
+        columns.append(column)
+    return np.rec.fromarrays(columns, names=names)
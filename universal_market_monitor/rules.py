@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+事件驱动的警报规则引擎
+
+事件: {'type': 'tick' | 'bar' | 'position' | 'position_bar' | 'balance', 'symbol': ..., ...}
+规则在 config.json 的 "rules" 中声明，按 (事件类型, 标的) 建立索引；
+一个事件只会交给订阅了该类型且匹配该标的的规则，其余规则完全不参与计算。
+仅依赖标准库，轻量入口也可以使用。
+"""
+
+from .records import Alert
+
+EVENT_TICK = 'tick'
+EVENT_BAR = 'bar'
+EVENT_POSITION = 'position'
+EVENT_POSITION_BAR = 'position_bar'  # 持仓 + 最新K线形态，用于离场判断
+EVENT_BALANCE = 'balance'
+
+RULE_TYPES = {}
+
+
+def register_rule(type_name):
+    """注册规则类型，config.json 中通过 "type" 引用"""
+    def decorator(cls):
+        cls.type_name = type_name
+        RULE_TYPES[type_name] = cls
+        return cls
+    return decorator
+
+
+class Rule:
+    """规则基类: 子类声明 events 并实现 evaluate(event, state) -> Alert或None"""
+
+    events = ()
+    needs_bar = False  # 为True时调用方需要在事件里附带K线形态
+    config_params = {}  # {参数名: CONFIG键}，规则未显式配置时取全局配置
+
+    def __init__(self, name, symbols=None, events=None, **params):
+        self.name = name
+        self.symbols = list(symbols) if symbols else None  # None = 全部标的
+        if events:
+            self.events = tuple(events)
+        self.params = params
+
+    def evaluate(self, event, state):
+        raise NotImplementedError
+
+
+def _prev_price(event, state):
+    """上一次价格: 事件自带(跨进程场景)优先，否则用规则自身记录"""
+    return event.get('prev_price', state.get('last_price'))
+
+
+def _position_side(event):
+    """持仓方向 long/short；单向持仓(posSide=net)按持仓数量 pos 的正负判断"""
+    side = event['side']
+    if side in ('long', 'short'):
+        return side
+    return 'long' if event['pos'] > 0 else 'short'
+
+
+# ============ 内置规则 ============
+@register_rule('price_cross')
+class PriceCrossRule(Rule):
+    """价格上穿 above / 下穿 below"""
+
+    events = (EVENT_TICK, EVENT_BAR)
+
+    def evaluate(self, event, state):
+        price = event['price']
+        last = _prev_price(event, state)
+        state['last_price'] = price
+        if last is None:
+            return None
+        above = self.params.get('above')
+        below = self.params.get('below')
+        symbol = event['symbol']
+        if above is not None and last <= above < price:
+            return Alert(type='price_cross', symbol=symbol, price=price, level=above,
+                         message=f'📈 {symbol} 上穿 ${above:.2f}')
+        if below is not None and last >= below > price:
+            return Alert(type='price_cross', symbol=symbol, price=price, level=below,
+                         message=f'📉 {symbol} 下穿 ${below:.2f}')
+        return None
+
+
+@register_rule('price_change')
+class PriceChangeRule(Rule):
+    """
+    两次观测之间的涨跌幅超过 threshold
+    只订阅 tick，由轻量入口 price_alert 使用；monitor 的 bar 事件改用自适应波动检测
+    """
+
+    events = (EVENT_TICK,)
+    config_params = {'threshold': 'price_alert_threshold'}
+
+    def evaluate(self, event, state):
+        price = event['price']
+        last = _prev_price(event, state)
+        state['last_price'] = price
+        if not last:
+            return None
+        change = abs(price - last) / last
+        if change <= self.params.get('threshold', 0.02):
+            return None
+        symbol = event['symbol']
+        direction = '上涨' if price > last else '下跌'
+        return Alert(type='volatility', symbol=symbol, price=price, change_pct=change * 100,
+                     message=f'⚠️ {symbol} 大幅{direction} {change*100:.2f}%')
+
+
+@register_rule('sr_break')
+class SupportResistanceBreakRule(Rule):
+    """突破阻力位 / 跌破支撑位"""
+
+    events = (EVENT_TICK, EVENT_BAR)
+
+    def evaluate(self, event, state):
+        price = event['price']
+        last = _prev_price(event, state)
+        state['last_price'] = price
+        support = event.get('support')
+        resistance = event.get('resistance')
+        if last is None:
+            return None
+        symbol = event['symbol']
+        if support and price < support <= last:
+            return Alert(type='breakdown', symbol=symbol, price=price, level=support,
+                         message=f'🚨 {symbol} 跌破支撑位 ${support:.2f}')
+        if resistance and price > resistance >= last:
+            return Alert(type='breakout', symbol=symbol, price=price, level=resistance,
+                         message=f'🚀 {symbol} 突破阻力位 ${resistance:.2f}')
+        return None
+
+
+@register_rule('position_pnl')
+class PositionPnlRule(Rule):
+    """持仓触及止损 / 止盈 (按开仓均价计算)"""
+
+    events = (EVENT_POSITION,)
+    config_params = {'stop_loss_pct': 'stop_loss_pct', 'take_profit_pct': 'take_profit_pct'}
+
+    def evaluate(self, event, state):
+        entry = event['entry_price']
+        mark = event['mark_price']
+        if not entry:
+            return None
+        side = _position_side(event)
+        symbol = event['symbol']
+        pnl_pct = (mark - entry) / entry if side == 'long' else (entry - mark) / entry
+        label = '多头' if side == 'long' else '空头'
+        if pnl_pct <= -self.params.get('stop_loss_pct', 0.033):
+            return Alert(type='stop_loss', symbol=symbol, side=side, pnl_pct=pnl_pct * 100,
+                         message=f'⛔ {symbol} {label}触及止损 {pnl_pct*100:.2f}%')
+        if pnl_pct >= self.params.get('take_profit_pct', 0.084):
+            return Alert(type='take_profit', symbol=symbol, side=side, pnl_pct=pnl_pct * 100,
+                         message=f'✅ {symbol} {label}达到止盈 {pnl_pct*100:.2f}%')
+        return None
+
+
+@register_rule('exit_signal')
+class ExitSignalRule(Rule):
+    """
+    盈利+反转形态建议止盈，亏损+结构破坏建议止损
+    min_profit_pct / max_loss_pct 与事件的 pnl_pct 一样是百分数，均为正数(5 表示 5%)
+    """
+
+    events = (EVENT_POSITION_BAR,)
+    needs_bar = True
+
+    def evaluate(self, event, state):
+        side = _position_side(event)
+        pnl_pct = event['pnl_pct']
+        if pnl_pct >= self.params.get('min_profit_pct', 5):
+            if (side == 'long' and event.get('bearish')) or (side == 'short' and event.get('bullish')):
+                return Alert(type='TAKE_PROFIT_SUGGEST', symbol=event['symbol'], side=side,
+                             pnl_pct=pnl_pct, suggestion='建议减仓50%锁定利润，出现反转信号')
+        if pnl_pct <= -self.params.get('max_loss_pct', 3):
+            mark = event['mark_price']
+            support = event.get('support')
+            resistance = event.get('resistance')
+            if ((side == 'long' and support is not None and mark < support) or
+                    (side == 'short' and resistance is not None and mark > resistance)):
+                return Alert(type='STOP_LOSS_SUGGEST', symbol=event['symbol'], side=side,
+                             pnl_pct=pnl_pct, suggestion='建议止损离场，结构已破坏')
+        return None
+
+
+@register_rule('balance_change')
+class BalanceChangeRule(Rule):
+    """余额相对上次变动超过 threshold"""
+
+    events = (EVENT_BALANCE,)
+    config_params = {'threshold': 'balance_change_threshold'}
+
+    def evaluate(self, event, state):
+        balance = event['balance']
+        last = state.get('last_balance')
+        state['last_balance'] = balance
+        if not last:
+            return None
+        change = abs(balance - last) / last
+        if change <= self.params.get('threshold', 0.05):
+            return None
+        direction = '增加' if balance > last else '减少'
+        return Alert(type='balance_anomaly', balance=balance, change_pct=change * 100,
+                     message=f'🔔 账户余额异常{direction} {change*100:.2f}%，当前: ${balance:.2f}')
+
+
+@register_rule('balance_below')
+class BalanceBelowRule(Rule):
+    """余额低于 min_balance"""
+
+    events = (EVENT_BALANCE,)
+
+    def evaluate(self, event, state):
+        balance = event['balance']
+        floor = self.params.get('min_balance', 0)
+        was_below = state.get('below', False)
+        state['below'] = balance < floor
+        if state['below'] and not was_below:
+            return Alert(type='balance_low', balance=balance,
+                         message=f'🔔 账户余额低于 ${floor:.2f}，当前: ${balance:.2f}')
+        return None
+
+
+# ============ 引擎 ============
+class RuleEngine:
+    """按 (事件类型, 标的) 索引规则并分发事件"""
+
+    def __init__(self, rules=()):
+        self.rules = []
+        self._by_symbol = {}  # {event_type: {symbol: [rule, ...]}}
+        self._any_symbol = {}  # {event_type: [rule, ...]}
+        self._state = {}  # {(rule.name, symbol): {}}
+        for rule in rules:
+            self.add_rule(rule)
+
+    @classmethod
+    def from_config(cls, specs, config=None):
+        """specs: config.json 中的 "rules" 列表；config: 全局配置，为规则未指定的参数提供默认值"""
+        rules = []
+        for i, spec in enumerate(specs):
+            spec = dict(spec)
+            type_name = spec.pop('type')
+            if type_name not in RULE_TYPES:
+                raise ValueError(f"未知规则类型: {type_name}")
+            rule_cls = RULE_TYPES[type_name]
+            for param, key in rule_cls.config_params.items():
+                if param not in spec and config and key in config:
+                    spec[param] = config[key]
+            name = spec.pop('name', f"{type_name}_{i}")
+            rules.append(rule_cls(name, **spec))
+        return cls(rules)
+
+    def add_rule(self, rule):
+        self.rules.append(rule)
+        for event_type in rule.events:
+            if rule.symbols is None:
+                self._any_symbol.setdefault(event_type, []).append(rule)
+            else:
+                by_symbol = self._by_symbol.setdefault(event_type, {})
+                for symbol in rule.symbols:
+                    by_symbol.setdefault(symbol, []).append(rule)
+
+    def subscribers(self, event_type, symbol=None):
+        """订阅该事件的规则，调用方可据此跳过不必要的数据获取"""
+        specific = self._by_symbol.get(event_type, {}).get(symbol, ())
+        return list(specific) + self._any_symbol.get(event_type, [])
+
+    def has_subscribers(self, event_type, symbol=None, needs_bar=None):
+        for rule in self.subscribers(event_type, symbol):
+            if needs_bar is None or rule.needs_bar == needs_bar:
+                return True
+        return False
+
+    def dispatch(self, event):
+        """分发一个事件，返回触发的警报列表"""
+        event_type = event['type']
+        symbol = event.get('symbol')
+        alerts = []
+        for rule in self.subscribers(event_type, symbol):
+            key = (rule.name, symbol)
+            state = self._state.get(key)
+            if state is None:
+                state = self._state[key] = {}
+            alert = rule.evaluate(event, state)
+            if alert is not None:
+                alert.rule = rule.name
+                alerts.append(alert)
+        return alerts